@@ -0,0 +1,154 @@
+import logging
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Database models
+Base = declarative_base()
+
+class Category(Base):
+    """Database model for memory categories, shared by all memories in them."""
+    __tablename__ = 'categories'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    name = sa.Column(sa.String(64), unique=True, index=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Category {self.name}>"
+
+
+class Memory(Base):
+    """Database model for storing memories."""
+    __tablename__ = 'memories'
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    key = sa.Column(sa.String(128), unique=True, index=True, nullable=False)
+    value = sa.Column(sa.Text, nullable=False)
+    category_id = sa.Column(sa.Integer, sa.ForeignKey('categories.id'), index=True, nullable=True)
+    # The SQL-side default also covers tables created before the columns
+    # had a server default, which create_all leaves as they are
+    created_at = sa.Column(sa.DateTime(timezone=True), default=sa.func.now(), server_default=sa.func.now(), nullable=False)
+    updated_at = sa.Column(sa.DateTime(timezone=True), default=sa.func.now(), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Memory {self.key}: {self.value[:30]}...>"
+
+
+# Statements are built once with bind parameters so every call reuses the
+# same compiled SQL (and the driver/server plan cache) instead of
+# constructing a new query object per lookup.
+KEY_STMT = sa.select(Memory).where(Memory.key == sa.bindparam("k"))
+RECALL_STMT = sa.select(Memory.value, Category.name).outerjoin(
+    Category, Memory.category_id == Category.id
+).where(Memory.key == sa.bindparam("k"))
+
+# Read paths select plain columns so rows come back as tuples rather
+# than identity-mapped Memory instances.
+LIST_STMT = sa.select(Memory.key, Memory.value, Category.name).outerjoin(
+    Category, Memory.category_id == Category.id
+).order_by(Memory.key)
+# Filters on the integer foreign key rather than the category name
+LIST_BY_CATEGORY_STMT = LIST_STMT.where(Memory.category_id == sa.bindparam("c"))
+CATEGORIES_STMT = sa.select(Category.name).join(
+    Memory, Memory.category_id == Category.id
+).distinct()
+
+SEARCH_STMT = sa.select(Memory.key, Memory.value, Category.name).outerjoin(
+    Category, Memory.category_id == Category.id
+).where(
+    sa.or_(
+        Memory.key.ilike(sa.bindparam("p")),
+        Memory.value.ilike(sa.bindparam("p"))
+    )
+).order_by(Memory.key)
+
+
+def create_session_factory(db_url):
+    """
+    Create the engine and tables for a database URL.
+
+    Args:
+        db_url: SQLAlchemy database URL
+
+    Returns:
+        Tuple of (engine, session factory)
+    """
+    engine = sa.create_engine(db_url)
+    Base.metadata.create_all(engine)
+    migrate_categories(engine)
+    migrate_unique_keys(engine)
+    return engine, sa.orm.sessionmaker(bind=engine)
+
+
+def migrate_categories(engine):
+    """Move a legacy inline memories.category column onto the categories table."""
+    columns = {column["name"] for column in sa.inspect(engine).get_columns("memories")}
+    if "category_id" in columns:
+        return
+
+    logger.info("Migrating memory categories to the categories table")
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "ALTER TABLE memories ADD COLUMN category_id INTEGER REFERENCES categories(id)"
+        ))
+        conn.execute(sa.text("CREATE INDEX ix_memories_category_id ON memories (category_id)"))
+        if "category" in columns:
+            conn.execute(sa.text(
+                "INSERT INTO categories (name) "
+                "SELECT DISTINCT category FROM memories WHERE category IS NOT NULL"
+            ))
+            conn.execute(sa.text(
+                "UPDATE memories SET category_id = "
+                "(SELECT id FROM categories WHERE categories.name = memories.category)"
+            ))
+
+
+def migrate_unique_keys(engine):
+    """
+    Make memories.key unique on tables created while it was only indexed.
+    
+    Duplicate keys are removed first, keeping the most recently added row
+    of each; INSERT ... ON CONFLICT (key) needs the unique index.
+    """
+    inspector = sa.inspect(engine)
+    for index in inspector.get_indexes("memories"):
+        if index["column_names"] == ["key"] and index["unique"]:
+            return
+    for constraint in inspector.get_unique_constraints("memories"):
+        if constraint["column_names"] == ["key"]:
+            return
+    
+    logger.info("Making memory keys unique")
+    with engine.begin() as conn:
+        conn.execute(sa.text(
+            "DELETE FROM memories WHERE EXISTS ("
+            "SELECT 1 FROM memories AS newer "
+            "WHERE newer.key = memories.key AND newer.id > memories.id)"
+        ))
+        conn.execute(sa.text("DROP INDEX IF EXISTS ix_memories_key"))
+        conn.execute(sa.text("CREATE UNIQUE INDEX IF NOT EXISTS ix_memories_key ON memories (key)"))
+
+
+def upsert_memories_stmt(rows):
+    """
+    Build a PostgreSQL multi-row INSERT ... ON CONFLICT (key) DO UPDATE.
+
+    Args:
+        rows: List of {"key", "value", "category_id"} dicts with unique keys
+
+    Returns:
+        The insert statement
+    """
+    stmt = postgresql.insert(Memory).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={
+            "value": stmt.excluded.value,
+            # Keep the stored category when none is supplied
+            "category_id": sa.func.coalesce(stmt.excluded.category_id, Memory.category_id),
+            "updated_at": sa.func.now()
+        }
+    )
@@ -1,33 +1,46 @@
 import os
+import sys
 import json
+import math
+import hashlib
 import logging
+import threading
 import datetime
+import msgpack
 from pathlib import Path
 from agents.base_agent import BaseAgent
-from flask_sqlalchemy import SQLAlchemy
-import sqlalchemy as sa
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.declarative import declarative_base
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Database models
-Base = declarative_base()
 
-class Memory(Base):
-    """Database model for storing memories."""
-    __tablename__ = 'memories'
-    
-    id = sa.Column(sa.Integer, primary_key=True)
-    key = sa.Column(sa.String(128), index=True, nullable=False)
-    value = sa.Column(sa.Text, nullable=False)
-    category = sa.Column(sa.String(64), index=True, nullable=True)
-    created_at = sa.Column(sa.DateTime, default=datetime.datetime.utcnow)
-    updated_at = sa.Column(sa.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
-    
-    def __repr__(self):
-        return f"<Memory {self.key}: {self.value[:30]}...>"
+class _BloomFilter:
+    """
+    Fixed-size bloom filter over memory keys.
+    
+    A miss means the key was never added, so lookups for absent keys can be
+    answered without touching the database. Hits may be false positives and
+    still go to storage. Keys cannot be removed; rebuild the filter instead.
+    """
+    
+    def __init__(self, capacity=100_000, error_rate=0.001):
+        self.size = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    
+    def _positions(self, key):
+        # Double hashing: derive all probe positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.num_hashes)]
+    
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
 
 
 class MemoryKeeperAgent(BaseAgent):
@@ -41,6 +54,11 @@ class MemoryKeeperAgent(BaseAgent):
     - Managing categories of information
     """
     
+    # Number of logged file-store operations before the snapshot is rewritten
+    _COMPACT_EVERY = 1000
+    # Number of forgets before the key bloom filter is rebuilt to drop stale keys
+    _BLOOM_REBUILD_EVERY = 10_000
+    
     def __init__(self, db_url=None):
         """Initialize the MemoryKeeper Agent."""
         super().__init__(
@@ -49,15 +67,41 @@ class MemoryKeeperAgent(BaseAgent):
         )
         
         # Set up the memory storage
-        self.memory_file = "memory_store.json"
-        self.memories = {}
-        
-        # Load existing memories from file
-        self._load_memories()
+        self.memory_file = "memory_store.mpk"
+        # Snapshot format used before msgpack, migrated on first load
+        self.legacy_memory_file = "memory_store.json"
+        # Append-only log of changes made since the last snapshot
+        self.log_file = "memory_store.log"
+        # Loaded on first access through the memories property
+        self._memories = None
+        self._memories_lock = threading.Lock()
+        self._log = None
+        self._log_ops = 0
+        # Category names seen so far, used to parse "remember" arguments
+        self._known_categories = set()
+        # Every key in the file store, so missing keys skip the lookup when
+        # no database is used. The file store has this agent as its only
+        # writer; a database may be shared with other workers, so it is
+        # always queried.
+        self._bloom = _BloomFilter()
+        self._forgets = 0
         
         # Database configuration
         self.db_url = db_url or os.environ.get("DATABASE_URL")
         self.db_initialized = False
+        # Category name -> id, filled lazily as categories are used
+        self._category_ids = {}
+        
+        # Command name -> handler, built once instead of an if/elif chain per call
+        self._dispatch = {
+            "remember": self._cmd_remember,
+            "remember-batch": self._cmd_remember_batch,
+            "recall": self._cmd_recall,
+            "forget": self._cmd_forget,
+            "list": self._cmd_list,
+            "search": self._cmd_search,
+            "categories": self._cmd_categories
+        }
         
         # Initialize database if URL is provided
         if self.db_url:
@@ -71,10 +115,19 @@ class MemoryKeeperAgent(BaseAgent):
         return {
             "remember": {
                 "description": "Store a piece of information for future retrieval",
-                "usage": "remember <key> <value> [category]",
+                "usage": "remember <key> <value> [category|#category|--category=<name>]",
                 "examples": [
                     "remember server_ip 192.168.1.100 infrastructure",
-                    "remember project_deadline '2023-12-31' schedule"
+                    "remember project_deadline '2023-12-31' schedule",
+                    "remember release_note shipped the new dashboard #changelog"
+                ]
+            },
+            "remember-batch": {
+                "description": "Store several pieces of information in a single write",
+                "usage": "remember-batch <json-array>",
+                "examples": [
+                    "remember-batch '[[\"server_ip\", \"192.168.1.100\", \"infrastructure\"], [\"db_port\", \"5432\"]]'",
+                    "remember-batch '[{\"key\": \"owner\", \"value\": \"ops-team\", \"category\": \"contacts\"}]'"
                 ]
             },
             "recall": {
@@ -120,53 +173,78 @@ class MemoryKeeperAgent(BaseAgent):
     def execute(self, command, args):
         """Execute a MemoryKeeperAgent command."""
         try:
-            if command == "remember":
-                if len(args) < 2:
-                    return "Error: Missing key or value. Usage: remember <key> <value> [category]"
-                key = args[0]
-                # Join all remaining args except the last one (which might be a category)
-                value = " ".join(args[1:-1]) if len(args) > 2 else args[1]
-                category = args[-1] if len(args) > 2 else None
-                
-                # If the value is exactly the same as the key, or the last arg is part of the value
-                if value == key or (len(args) > 2 and category in value):
-                    value = " ".join(args[1:])
-                    category = None
-                
-                return self._remember(key, value, category)
-                
-            elif command == "recall":
-                if not args:
-                    return "Error: Missing key. Usage: recall <key>"
-                key = args[0]
-                return self._recall(key)
-                
-            elif command == "forget":
-                if not args:
-                    return "Error: Missing key. Usage: forget <key>"
-                key = args[0]
-                return self._forget(key)
-                
-            elif command == "list":
-                category = args[0] if args else None
-                return self._list_memories(category)
-                
-            elif command == "search":
-                if not args:
-                    return "Error: Missing search term. Usage: search <term>"
-                term = args[0]
-                return self._search_memories(term)
-                
-            elif command == "categories":
-                return self._list_categories()
-                
-            else:
+            handler = self._dispatch.get(command)
+            if handler is None:
                 return f"Unknown command: '{command}'"
+            return handler(args)
                 
         except Exception as e:
             logger.error(f"Error in MemoryKeeperAgent: {str(e)}")
             return f"Error executing command: {str(e)}"
     
+    def _cmd_remember(self, args):
+        """Handle the remember command."""
+        if len(args) < 2:
+            return "Error: Missing key or value. Usage: remember <key> <value> [category]"
+        key = args[0]
+        category = None
+        end = len(args)
+        
+        # Decide whether the last arg is a category before building the value,
+        # so the value is joined exactly once
+        if len(args) > 2:
+            last = args[-1]
+            if last.startswith("--category="):
+                category = last[len("--category="):]
+            elif last.startswith("#"):
+                category = last[1:]
+            elif (len(args) == 3 or " " in key) and " ".join(args[1:-1]) == key:
+                # As before, a value that would be just the key keeps its last
+                # word: "remember name name Bob" stores "name Bob"
+                pass
+            elif last in self._known_categories or not any(last in part for part in args[1:-1]):
+                category = last
+            # Otherwise the last arg is treated as part of the value
+            if category is not None:
+                end -= 1
+        
+        value = args[1] if end == 2 else " ".join(args[1:end])
+        return self._remember(key, value, category or None)
+    
+    def _cmd_remember_batch(self, args):
+        """Handle the remember-batch command."""
+        if not args:
+            return "Error: Missing memories. Usage: remember-batch <json-array>"
+        pairs = self._parse_batch(" ".join(args))
+        return self.remember_many(pairs)
+    
+    def _cmd_recall(self, args):
+        """Handle the recall command."""
+        if not args:
+            return "Error: Missing key. Usage: recall <key>"
+        return self._recall(args[0])
+    
+    def _cmd_forget(self, args):
+        """Handle the forget command."""
+        if not args:
+            return "Error: Missing key. Usage: forget <key>"
+        return self._forget(args[0])
+    
+    def _cmd_list(self, args):
+        """Handle the list command."""
+        category = args[0] if args else None
+        return self._list_memories(category)
+    
+    def _cmd_search(self, args):
+        """Handle the search command."""
+        if not args:
+            return "Error: Missing search term. Usage: search <term>"
+        return self._search_memories(args[0])
+    
+    def _cmd_categories(self, args):
+        """Handle the categories command."""
+        return self._list_categories()
+    
     def _init_db(self):
         """Initialize the database connection and create tables if needed."""
         try:
@@ -174,9 +252,12 @@ class MemoryKeeperAgent(BaseAgent):
                 logger.warning("No database URL provided, will use file-based storage")
                 return
             
-            engine = sa.create_engine(self.db_url)
-            Base.metadata.create_all(engine)
-            self.engine = engine
+            # SQLAlchemy is only imported once a database is configured, so the
+            # file-only setup never pays for it
+            from agents import memory_models
+            
+            self.engine, self._session_factory = memory_models.create_session_factory(self.db_url)
+            self._models = memory_models
             self.db_initialized = True
             logger.info("Database initialized successfully")
             
@@ -184,37 +265,181 @@ class MemoryKeeperAgent(BaseAgent):
             logger.error(f"Error initializing database: {str(e)}")
             raise
     
+    def _rebuild_bloom(self):
+        """Rebuild the bloom filter from current keys, dropping forgotten ones."""
+        bloom = _BloomFilter()
+        for key in self.memories:
+            bloom.add(key)
+        self._bloom = bloom
+        self._forgets = 0
+        logger.debug("Rebuilt memory key bloom filter")
+    
+    def _category_id(self, session, name, create=True):
+        """
+        Resolve a category name to its id, caching the result.
+        
+        Args:
+            session: The database session to use
+            name: The category name
+            create: Whether to insert the category if it does not exist
+            
+        Returns:
+            The category id, or None if it does not exist and create is False
+        """
+        if not name:
+            return None
+        
+        category_id = self._category_ids.get(name)
+        if category_id is not None:
+            return category_id
+        
+        Category = self._models.Category
+        category = session.query(Category).filter_by(name=name).first()
+        if category is None:
+            if not create:
+                return None
+            category = Category(name=name)
+            session.add(category)
+            session.flush()
+        
+        self._category_ids[name] = category.id
+        return category.id
+    
     def _db_session(self):
         """Create a new database session."""
         if not self.db_initialized:
             return None
         
-        Session = sa.orm.sessionmaker(bind=self.engine)
-        return Session()
+        return self._session_factory()
+    
+    @property
+    def memories(self):
+        """The file-backed memories, loaded from disk on first access."""
+        if self._memories is None:
+            self._ensure_memories_loaded()
+        return self._memories
+    
+    def _ensure_memories_loaded(self):
+        """Load the file store once, off the constructor's critical path."""
+        if self._memories is not None:
+            return
+        with self._memories_lock:
+            if self._memories is None:
+                self._load_memories()
     
     def _load_memories(self):
-        """Load memories from JSON file if it exists."""
+        """Load memories from the msgpack snapshot, then replay the change log."""
         try:
+            migrate = False
             if os.path.exists(self.memory_file):
-                with open(self.memory_file, 'r') as f:
-                    self.memories = json.load(f)
-                logger.debug(f"Loaded {len(self.memories)} memories from file")
+                with open(self.memory_file, 'rb') as f:
+                    memories = msgpack.unpackb(f.read(), raw=False)
+                logger.debug(f"Loaded {len(memories)} memories from file")
+            elif os.path.exists(self.legacy_memory_file):
+                with open(self.legacy_memory_file, 'r') as f:
+                    memories = json.load(f)
+                migrate = True
+                logger.debug(f"Loaded {len(memories)} memories from legacy JSON file")
             else:
-                self.memories = {}
+                memories = {}
                 logger.debug("No memory file found, starting with empty memory")
+            
+            self._log_ops = self._replay_log(memories)
+            
+            # Seed the bloom filter and share one string object per category
+            for key, data in memories.items():
+                self._bloom.add(key)
+                if data.get("category"):
+                    data["category"] = sys.intern(data["category"])
+                    self._known_categories.add(data["category"])
+            
+            self._memories = memories
+            
+            if migrate:
+                # One-shot conversion; the JSON file is left in place as a backup
+                self._compact()
+                logger.info(f"Migrated {self.legacy_memory_file} to {self.memory_file}")
         except Exception as e:
             logger.error(f"Error loading memories from file: {str(e)}")
-            self.memories = {}
+            self._memories = {}
     
-    def _save_memories(self):
-        """Save memories to JSON file."""
+    def _replay_log(self, memories):
+        """
+        Apply logged operations on top of the loaded snapshot.
+        
+        Args:
+            memories: The snapshot dict to update in place
+            
+        Returns:
+            Number of operations replayed
+        """
+        if not os.path.exists(self.log_file):
+            return 0
+        
+        replayed = 0
+        with open(self.log_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    logger.warning("Skipping unreadable memory log entry")
+                    continue
+                
+                if entry["op"] == "set":
+                    memories[entry["k"]] = entry["v"]
+                elif entry["op"] == "del":
+                    memories.pop(entry["k"], None)
+                replayed += 1
+        
+        logger.debug(f"Replayed {replayed} memory log entries")
+        return replayed
+    
+    def _append_log(self, entries):
+        """
+        Append operations to the change log, compacting when it grows large.
+        
+        Args:
+            entries: List of {"op": "set"|"del", "k": key[, "v": data]} dicts
+        """
         try:
-            with open(self.memory_file, 'w') as f:
-                json.dump(self.memories, f, indent=2)
+            if self._log is None:
+                self._log = open(self.log_file, 'a')
+            self._log.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self._log.flush()
+            
+            self._log_ops += len(entries)
+            if self._log_ops >= self._COMPACT_EVERY:
+                self._compact()
+        except Exception as e:
+            logger.error(f"Error writing memory log: {str(e)}")
+    
+    def _compact(self):
+        """Write a fresh snapshot of all memories and truncate the change log."""
+        try:
+            tmp_file = self.memory_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(msgpack.packb(self.memories, use_bin_type=True))
+            os.replace(tmp_file, self.memory_file)
+            
+            # Every logged operation is now part of the snapshot
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            open(self.log_file, 'w').close()
+            self._log_ops = 0
             logger.debug(f"Saved {len(self.memories)} memories to file")
         except Exception as e:
             logger.error(f"Error saving memories to file: {str(e)}")
     
+    def close(self):
+        """Compact the file store and release the change log."""
+        if self._memories is not None and self._log_ops:
+            self._compact()
+        elif self._log is not None:
+            self._log.close()
+            self._log = None
+    
     def _remember(self, key, value, category=None):
         """
         Store a piece of information.
@@ -229,6 +454,9 @@ class MemoryKeeperAgent(BaseAgent):
         """
         try:
             logger.debug(f"Storing memory: {key} = {value} (category: {category})")
+            self._bloom.add(key)
+            if category:
+                self._known_categories.add(category)
             
             # Try to store in database first if available
             if self.db_initialized:
@@ -236,18 +464,19 @@ class MemoryKeeperAgent(BaseAgent):
                     session = self._db_session()
                     if session:
                         # Check if memory already exists
-                        existing = session.query(Memory).filter_by(key=key).first()
+                        existing = session.execute(self._models.KEY_STMT, {"k": key}).scalars().first()
+                        
+                        category_id = self._category_id(session, category)
                         
                         if existing:
                             existing.value = value
-                            if category:
-                                existing.category = category
-                            existing.updated_at = datetime.datetime.utcnow()
+                            if category_id:
+                                existing.category_id = category_id
                         else:
-                            new_memory = Memory(
+                            new_memory = self._models.Memory(
                                 key=key,
                                 value=value,
-                                category=category
+                                category_id=category_id
                             )
                             session.add(new_memory)
                         
@@ -256,6 +485,8 @@ class MemoryKeeperAgent(BaseAgent):
                         return f"Remembered: {key} = {value}" + (f" (category: {category})" if category else "")
                 except Exception as db_e:
                     logger.error(f"Database storage failed, falling back to file storage: {db_e}")
+                    # Category ids resolved in a rolled-back transaction may not exist
+                    self._category_ids.clear()
             
             # Fall back to file-based storage
             memory_data = {
@@ -264,10 +495,10 @@ class MemoryKeeperAgent(BaseAgent):
             }
             
             if category:
-                memory_data["category"] = category
+                memory_data["category"] = sys.intern(category)
             
             self.memories[key] = memory_data
-            self._save_memories()
+            self._append_log([{"op": "set", "k": key, "v": memory_data}])
             
             return f"Remembered: {key} = {value}" + (f" (category: {category})" if category else "")
             
@@ -275,6 +506,118 @@ class MemoryKeeperAgent(BaseAgent):
             logger.error(f"Error storing memory: {str(e)}")
             return f"Error storing memory: {str(e)}"
     
+    def _parse_batch(self, text):
+        """
+        Parse a JSON array of memories into (key, value, category) tuples.
+        
+        Each item may be a [key, value] or [key, value, category] list, or an
+        object with "key", "value" and optional "category" fields.
+        """
+        items = json.loads(text)
+        if not isinstance(items, list):
+            raise ValueError("remember-batch expects a JSON array")
+        
+        pairs = []
+        for item in items:
+            if isinstance(item, dict):
+                key, value, category = item["key"], item["value"], item.get("category")
+            elif isinstance(item, (list, tuple)) and len(item) in (2, 3):
+                key, value = item[0], item[1]
+                category = item[2] if len(item) == 3 else None
+            else:
+                raise ValueError(f"Invalid memory entry: {item!r}")
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            pairs.append((str(key), value, category or None))
+        return pairs
+    
+    def remember_many(self, pairs):
+        """
+        Store several pieces of information in a single write.
+        
+        On PostgreSQL this is one multi-row INSERT ... ON CONFLICT DO UPDATE,
+        so the whole batch costs one round-trip and one commit. The file
+        fallback updates every entry in memory and saves the file once.
+        
+        Args:
+            pairs: List of (key, value, category) tuples; category may be None
+            
+        Returns:
+            Confirmation message
+        """
+        try:
+            if not pairs:
+                return "Error: No memories to store."
+            
+            # Later duplicates of a key win, matching sequential remember calls
+            rows = {key: {"key": key, "value": value, "category": category}
+                    for key, value, category in pairs}
+            logger.debug(f"Storing {len(rows)} memories in batch")
+            self._known_categories.update(row["category"] for row in rows.values() if row["category"])
+            for key in rows:
+                self._bloom.add(key)
+            
+            # Try to store in database first if available
+            if self.db_initialized:
+                try:
+                    session = self._db_session()
+                    if session:
+                        try:
+                            db_rows = [
+                                {
+                                    "key": row["key"],
+                                    "value": row["value"],
+                                    "category_id": self._category_id(session, row["category"])
+                                }
+                                for row in rows.values()
+                            ]
+                            
+                            if self.engine.dialect.name == "postgresql":
+                                session.execute(self._models.upsert_memories_stmt(db_rows))
+                            else:
+                                Memory = self._models.Memory
+                                existing = {
+                                    memory.key: memory
+                                    for memory in session.query(Memory).filter(Memory.key.in_(list(rows)))
+                                }
+                                for row in db_rows:
+                                    memory = existing.get(row["key"])
+                                    if memory:
+                                        memory.value = row["value"]
+                                        if row["category_id"]:
+                                            memory.category_id = row["category_id"]
+                                    else:
+                                        session.add(Memory(**row))
+                            
+                            session.commit()
+                        finally:
+                            session.close()
+                        return f"Remembered {len(rows)} memories"
+                except Exception as db_e:
+                    logger.error(f"Database batch storage failed, falling back to file storage: {db_e}")
+                    # Category ids resolved in a rolled-back transaction may not exist
+                    self._category_ids.clear()
+            
+            # Fall back to file-based storage
+            timestamp = datetime.datetime.now().isoformat()
+            entries = []
+            for key, row in rows.items():
+                memory_data = {
+                    "value": row["value"],
+                    "timestamp": timestamp
+                }
+                if row["category"]:
+                    memory_data["category"] = sys.intern(row["category"])
+                self.memories[key] = memory_data
+                entries.append({"op": "set", "k": key, "v": memory_data})
+            self._append_log(entries)
+            
+            return f"Remembered {len(rows)} memories"
+            
+        except Exception as e:
+            logger.error(f"Error storing memories: {str(e)}")
+            return f"Error storing memories: {str(e)}"
+    
     def _recall(self, key):
         """
         Retrieve a piece of information.
@@ -287,18 +630,26 @@ class MemoryKeeperAgent(BaseAgent):
         """
         try:
             logger.debug(f"Retrieving memory: {key}")
+            # File keys must be in the bloom filter before it can rule a key
+            # out; keys in a shared database can be written by other workers,
+            # and the file store is only read once the database misses
+            if not self.db_initialized:
+                self._ensure_memories_loaded()
+                if key not in self._bloom:
+                    return f"No memory found for key: {key}"
             
             # Try to retrieve from database first if available
             if self.db_initialized:
                 try:
                     session = self._db_session()
                     if session:
-                        memory = session.query(Memory).filter_by(key=key).first()
+                        memory = session.execute(self._models.RECALL_STMT, {"k": key}).first()
                         session.close()
                         
                         if memory:
-                            category_info = f" (category: {memory.category})" if memory.category else ""
-                            return f"{key} = {memory.value}{category_info}"
+                            value, category = memory
+                            category_info = f" (category: {category})" if category else ""
+                            return f"{key} = {value}{category_info}"
                 except Exception as db_e:
                     logger.error(f"Database retrieval failed, falling back to file storage: {db_e}")
             
@@ -327,13 +678,22 @@ class MemoryKeeperAgent(BaseAgent):
         """
         try:
             logger.debug(f"Deleting memory: {key}")
+            # The bloom filter only serves agents without a database
+            if not self.db_initialized:
+                self._ensure_memories_loaded()
+                if key not in self._bloom:
+                    return f"No memory found for key: {key}"
+                
+                self._forgets += 1
+                if self._forgets >= self._BLOOM_REBUILD_EVERY:
+                    self._rebuild_bloom()
             
             # Try to delete from database first if available
             if self.db_initialized:
                 try:
                     session = self._db_session()
                     if session:
-                        memory = session.query(Memory).filter_by(key=key).first()
+                        memory = session.execute(self._models.KEY_STMT, {"k": key}).scalars().first()
                         
                         if memory:
                             session.delete(memory)
@@ -346,7 +706,7 @@ class MemoryKeeperAgent(BaseAgent):
             # Fall back to file-based storage
             if key in self.memories:
                 del self.memories[key]
-                self._save_memories()
+                self._append_log([{"op": "del", "k": key}])
                 return f"Forgotten: {key}"
             else:
                 return f"No memory found for key: {key}"
@@ -373,19 +733,20 @@ class MemoryKeeperAgent(BaseAgent):
                 try:
                     session = self._db_session()
                     if session:
-                        query = session.query(Memory)
-                        
                         if category:
-                            query = query.filter_by(category=category)
-                        
-                        memories = query.order_by(Memory.key).all()
+                            memories = session.execute(
+                                self._models.LIST_BY_CATEGORY_STMT,
+                                {"c": self._category_id(session, category, create=False)}
+                            ).all()
+                        else:
+                            memories = session.execute(self._models.LIST_STMT).all()
                         session.close()
                         
                         if memories:
                             result = f"Stored Memories" + (f" (category: {category})" if category else "") + ":\n\n"
-                            for memory in memories:
-                                category_info = f" (category: {memory.category})" if memory.category else ""
-                                result += f"- {memory.key} = {memory.value}{category_info}\n"
+                            for memory_key, value, memory_category in memories:
+                                category_info = f" (category: {memory_category})" if memory_category else ""
+                                result += f"- {memory_key} = {value}{category_info}\n"
                             return result
                         else:
                             return f"No memories found" + (f" for category: {category}" if category else "")
@@ -444,20 +805,15 @@ class MemoryKeeperAgent(BaseAgent):
                     session = self._db_session()
                     if session:
                         # Search in both key and value
-                        memories = session.query(Memory).filter(
-                            sa.or_(
-                                Memory.key.ilike(f"%{term}%"),
-                                Memory.value.ilike(f"%{term}%")
-                            )
-                        ).order_by(Memory.key).all()
+                        memories = session.execute(self._models.SEARCH_STMT, {"p": f"%{term}%"}).all()
                         
                         session.close()
                         
                         if memories:
                             result = f"Search Results for '{term}':\n\n"
-                            for memory in memories:
-                                category_info = f" (category: {memory.category})" if memory.category else ""
-                                result += f"- {memory.key} = {memory.value}{category_info}\n"
+                            for memory_key, value, memory_category in memories:
+                                category_info = f" (category: {memory_category})" if memory_category else ""
+                                result += f"- {memory_key} = {value}{category_info}\n"
                             return result
                         else:
                             return f"No memories found containing '{term}'"
@@ -511,7 +867,7 @@ class MemoryKeeperAgent(BaseAgent):
                     session = self._db_session()
                     if session:
                         # Get distinct categories
-                        categories = session.query(Memory.category).distinct().filter(Memory.category != None).all()
+                        categories = session.execute(self._models.CATEGORIES_STMT).all()
                         session.close()
                         
                         if categories:
@@ -1,12 +1,268 @@
+import os
+import re
+import math
+import time
+import json
+import heapq
+import sqlite3
+import hashlib
 import logging
+import threading
 import requests
 import trafilatura
-from urllib.parse import urlparse
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+from trafilatura.utils import load_html
+from urllib3.util.retry import Retry
 from agents.base_agent import BaseAgent
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Downloads are streamed and abandoned once this many bytes have arrived,
+# so oversized responses never reach the HTML parser
+_MAX_PAGE_BYTES = 2_000_000
+# Response types worth handing to the HTML parser
+_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+_DOWNLOAD_TIMEOUT = 10
+_USER_AGENT = "Mozilla/5.0 (compatible; ResearcherAgent/1.0)"
+
+# Parsed pages persist here across sessions and are revalidated with
+# conditional requests instead of being downloaded again
+_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "researcher_agent", "pages.sqlite3")
+
+# Whole-string http(s) URL; anything else (including plain text) fails on
+# the first few characters
+_URL_RE = re.compile(r'^https?://[^\s/$.?#]\S*$', re.I)
+
+# Sentence boundary: whitespace (including newlines) after terminal punctuation
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+# Word with inner apostrophes ("don't"); same matches as \b[\w']+\b, but
+# never backtracks over trailing apostrophes or evaluates word boundaries
+_WORD_RE = re.compile(r"\w+(?:'+\w+)*")
+
+# Common words ignored by word statistics and summary scoring
+_STOPWORDS = frozenset({
+    "the", "to", "and", "a", "in", "it", "is", "of", "that", "for",
+    "on", "with", "as", "was", "be", "this", "by", "are", "you", "from"
+})
+
+# Texts shorter than this are not given a common-words section
+_MIN_WORDS_FOR_COMMON = 50
+
+# Labels for readability levels 1-10
+_READABILITY_DESC = (
+    "Very Easy", "Easy", "Fairly Easy", "Standard", "Fairly Difficult",
+    "Difficult", "Very Difficult", "Extremely Difficult", "Academic", "Technical"
+)
+
+# Fixed part of the analyze output, filled in with a single format_map call
+_ANALYSIS_TMPL = (
+    "Text Analysis:\n\n"
+    "Word Count: {word_count}\n"
+    "Character Count: {char_count} (without spaces: {char_count_no_spaces})\n"
+    "Sentence Count: {sentence_count}\n"
+    "Average Word Length: {avg_word_length:.2f} characters\n"
+    "Average Sentence Length: {avg_sentence_length:.2f} words\n"
+    "Readability Level: {readability_level}/10 ({readability_desc})\n\n"
+)
+
+@dataclass
+class ParsedPage:
+    """
+    Everything extracted from a single download and parse of a web page.
+    
+    text stays None until a caller needs it; until then the raw HTML is
+    kept so the text can be extracted later without downloading again.
+    """
+    url: str
+    text: Optional[str] = None
+    links: List[str] = field(default_factory=list)
+    title: Optional[str] = None
+    html: Optional[bytes] = field(default=None, repr=False)
+
+
+def _readability_level(word_count, sentence_count, char_count_no_spaces):
+    """
+    Score text complexity on a 1-10 scale.
+    
+    Uses a simplified version of the Flesch-Kincaid grade level.
+    
+    Args:
+        word_count: Number of words in the text
+        sentence_count: Number of sentences in the text
+        char_count_no_spaces: Number of characters other than spaces
+        
+    Returns:
+        Readability level from 1 (very easy) to 10 (technical)
+    """
+    score = 0.39 * (word_count / max(sentence_count, 1)) + 11.8 * (char_count_no_spaces / max(word_count, 1)) - 15.59
+    return min(10, max(1, int(score / 10)))
+
+
+def _analyze(text):
+    """
+    Compute word, sentence and readability statistics for a text.
+    
+    Kept at module level with no agent state so batch analysis can ship it
+    to worker processes.
+    
+    Args:
+        text: Text to analyze
+        
+    Returns:
+        Formatted analysis results
+    """
+    # Perform basic text analysis
+    # 1. Word count
+    # Words exclude attached punctuation, which would inflate their length
+    words = _WORD_RE.findall(text)
+    word_count = len(words)
+    
+    # Without words every ratio below is meaningless
+    if not word_count:
+        return "Text Analysis:\n\nNo words found to analyze.\n"
+    
+    # 2. Character count
+    char_count = len(text)
+    # Count spaces instead of building a copy of the text without them
+    char_count_no_spaces = char_count - text.count(" ")
+    
+    # 3. Sentence count
+    sentences = [s for s in _SENT_RE.split(text) if s.strip()]
+    sentence_count = len(sentences)
+    
+    # 4. Average word length
+    # One joined copy is measured in C, rather than an int per word
+    avg_word_length = len("".join(words)) / max(word_count, 1)
+    
+    # 5. Average sentence length
+    avg_sentence_length = word_count / max(sentence_count, 1)
+    
+    # 6. Simple readability level (higher means more complex)
+    readability_level = _readability_level(word_count, sentence_count, char_count_no_spaces)
+    readability_desc = _READABILITY_DESC[readability_level - 1]
+    
+    # Common words (most frequent), ignoring stop words; snippets are too
+    # short for word frequencies to say anything, so skip counting them
+    if word_count < _MIN_WORDS_FOR_COMMON:
+        common_words = []
+    else:
+        common_words = Counter(
+            word for word in map(str.lower, words) if len(word) > 2 and word not in _STOPWORDS
+        ).most_common(5)
+    
+    # Format the results
+    result = _ANALYSIS_TMPL.format_map({
+        "word_count": word_count,
+        "char_count": char_count,
+        "char_count_no_spaces": char_count_no_spaces,
+        "sentence_count": sentence_count,
+        "avg_word_length": avg_word_length,
+        "avg_sentence_length": avg_sentence_length,
+        "readability_level": readability_level,
+        "readability_desc": readability_desc
+    })
+    
+    # List common words if available
+    if common_words:
+        lines = ["Most Common Words:"]
+        lines.extend(f"- {word}: {count} occurrences" for word, count in common_words)
+        result += "\n".join(lines) + "\n"
+    
+    return result
+
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after a fixed time."""
+    
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value, or None if it is missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class _PageStore:
+    """Persistent LRU store of parsed pages and their HTTP validators, in SQLite."""
+    
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Batch fetches share the connection across threads under the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, url TEXT, "
+            "text TEXT, links TEXT, title TEXT, accessed REAL)"
+        )
+        self._conn.commit()
+    
+    def get(self, key):
+        """Return (etag, last_modified, ParsedPage) for a stored page, or None."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT etag, last_modified, url, text, links, title FROM pages WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE pages SET accessed = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading persistent page cache: {str(e)}")
+            return None
+        
+        etag, last_modified, url, text, links, title = row
+        return etag, last_modified, ParsedPage(url=url, text=text, links=json.loads(links), title=title)
+    
+    def set(self, key, etag, last_modified, page):
+        """Store a page with text, evicting the least recently used pages if full."""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, etag, last_modified, page.url, page.text, json.dumps(page.links), page.title, time.time())
+                )
+                self._conn.execute(
+                    "DELETE FROM pages WHERE key IN "
+                    "(SELECT key FROM pages ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing persistent page cache: {str(e)}")
+
+
 class ResearcherAgent(BaseAgent):
     """
     The Researcher Agent - specialized in web scraping and document summarization.
@@ -18,12 +274,39 @@ class ResearcherAgent(BaseAgent):
     - Analyzing text content
     """
     
+    # Upper bound on simultaneous downloads for batch commands
+    _MAX_CONCURRENT_FETCHES = 16
+    
     def __init__(self):
         """Initialize the Researcher Agent."""
         super().__init__(
             name="ResearcherAgent",
             description="Specialized in web scraping and document summarization."
         )
+        
+        # Parsed pages keyed by URL hash, so chained commands on the same
+        # page (scrape, extract-links, summarize, analyze) download it once
+        self._page_cache = _TTLCache(maxsize=500, ttl=3600)
+        
+        # One pooled session for every download, so repeat requests to a
+        # host reuse the open keep-alive connection instead of paying the
+        # TCP and TLS handshakes again
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=100,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers["User-Agent"] = _USER_AGENT
+        
+        # Pages from earlier sessions; the agent still works without it
+        try:
+            self._page_store = _PageStore(_STORE_PATH, max_entries=2000)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Persistent page cache disabled: {str(e)}")
+            self._page_store = None
     
     def get_commands(self):
         """Return the commands this agent can handle."""
@@ -36,6 +319,13 @@ class ResearcherAgent(BaseAgent):
                     "scrape https://en.wikipedia.org/wiki/Python_(programming_language)"
                 ]
             },
+            "scrape-batch": {
+                "description": "Extract text content from several websites concurrently",
+                "usage": "scrape-batch <url1> <url2> ...",
+                "examples": [
+                    "scrape-batch https://news.ycombinator.com https://lobste.rs"
+                ]
+            },
             "summarize": {
                 "description": "Generate a brief summary of a text",
                 "usage": "summarize <text_or_url>",
@@ -58,6 +348,13 @@ class ResearcherAgent(BaseAgent):
                     "analyze https://en.wikipedia.org/wiki/Python_(programming_language)",
                     "analyze 'This is a sample text to analyze...'"
                 ]
+            },
+            "analyze-batch": {
+                "description": "Analyze the text content of several websites in parallel",
+                "usage": "analyze-batch <url1> <url2> ...",
+                "examples": [
+                    "analyze-batch https://docs.python.org/3/ https://peps.python.org/pep-0008/"
+                ]
             }
         }
     
@@ -71,6 +368,9 @@ class ResearcherAgent(BaseAgent):
                 url = args[0]
                 return self._scrape_website(url)
                 
+            elif command == "scrape-batch":
+                return self._scrape_batch(args)
+                
             elif command == "summarize":
                 text_or_url = args[0]
                 return self._summarize_text(text_or_url)
@@ -83,6 +383,9 @@ class ResearcherAgent(BaseAgent):
                 text_or_url = args[0]
                 return self._analyze_text(text_or_url)
                 
+            elif command == "analyze-batch":
+                return self._analyze_batch(args)
+                
             else:
                 return f"Unknown command: '{command}'"
                 
@@ -91,12 +394,167 @@ class ResearcherAgent(BaseAgent):
             return f"Error executing command: {str(e)}"
     
     def _is_url(self, text):
-        """Check if the given text is a URL."""
+        """Check if the given text is an http(s) URL."""
+        return bool(_URL_RE.match(text)) if isinstance(text, str) else False
+    
+    def _cache_key(self, url):
+        """Hash a URL after normalizing whitespace and scheme/host case."""
+        parsed = urlparse(url.strip())
+        normalized = parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower()).geturl()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    
+    def _download(self, url, etag=None, last_modified=None):
+        """
+        Download a page body through the pooled session.
+        
+        Args:
+            url: Website URL to download
+            etag: ETag of a stored copy, sent as If-None-Match
+            last_modified: Last-Modified of a stored copy, sent as If-Modified-Since
+            
+        Returns:
+            Tuple of (status, body, headers). status is None if the request
+            failed; body is None unless a usable page was downloaded, so a
+            304 Not Modified comes back with status 304 and no body.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
         try:
-            result = urlparse(text)
-            return all([result.scheme, result.netloc])
-        except:
-            return False
+            with self._session.get(url, headers=headers, timeout=_DOWNLOAD_TIMEOUT, stream=True) as response:
+                if response.status_code == 304:
+                    return 304, None, response.headers
+                if response.status_code != 200:
+                    logger.error(f"Download of {url} returned HTTP {response.status_code}")
+                    return response.status_code, None, response.headers
+                
+                # Headers arrive before the body, so PDFs, media and pages
+                # that announce an oversized body are dropped unread
+                content_type = response.headers.get("Content-Type", "")
+                if content_type and not content_type.lower().startswith(_HTML_CONTENT_TYPES):
+                    logger.error(f"Download of {url} is not HTML ({content_type})")
+                    return 200, None, response.headers
+                
+                length = response.headers.get("Content-Length", "")
+                if length.isdigit() and int(length) > _MAX_PAGE_BYTES:
+                    logger.error(f"Download of {url} exceeds {_MAX_PAGE_BYTES} bytes")
+                    return 200, None, response.headers
+                
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    body += chunk
+                    if len(body) > _MAX_PAGE_BYTES:
+                        logger.error(f"Download of {url} exceeds {_MAX_PAGE_BYTES} bytes")
+                        return 200, None, response.headers
+                return 200, bytes(body), response.headers
+        except requests.RequestException as e:
+            logger.error(f"Error downloading {url}: {str(e)}")
+            return None, None, None
+    
+    def _fetch_parsed(self, url, with_text=True):
+        """
+        Download and parse a page once, extracting links, title and text.
+        
+        Text extraction costs far more than parsing the page and collecting
+        its links, so callers that only need links can skip it.
+        
+        Args:
+            url: Website URL to fetch
+            with_text: Whether the page's main text must be extracted
+            
+        Returns:
+            Tuple of (ParsedPage, error); exactly one of them is None
+        """
+        key = self._cache_key(url)
+        page = self._page_cache.get(key)
+        if page is not None:
+            logger.debug(f"Page cache hit: {url}")
+            if with_text and page.text is None:
+                page.text = self._extract_text(load_html(page.html), url)
+                page.html = None
+            return page, None
+        
+        # A page stored by an earlier session is only downloaded again if
+        # the server reports that it changed
+        stored = self._page_store.get(key) if self._page_store else None
+        if stored:
+            etag, last_modified, stored_page = stored
+            status, downloaded, headers = self._download(url, etag, last_modified)
+            if status == 304:
+                logger.debug(f"Page not modified since it was stored: {url}")
+                self._page_cache.set(key, stored_page)
+                return stored_page, None
+        else:
+            status, downloaded, headers = self._download(url)
+        
+        if downloaded is None:
+            return None, f"Error: Could not download content from {url}"
+        
+        # Build the lxml tree once; trafilatura.extract works on a copy of it
+        tree = load_html(downloaded)
+        if tree is None:
+            return None, f"Error: Could not parse content from {url}"
+        
+        page = ParsedPage(
+            url=url,
+            links=self._parse_links(tree, url),
+            title=tree.findtext(".//title")
+        )
+        if with_text:
+            page.text = self._extract_text(tree, url)
+        else:
+            page.html = downloaded
+        
+        # Only successful fetches are cached, so failures are retried
+        self._page_cache.set(key, page)
+        
+        # Persisting is only worth it when the server gives a validator to
+        # revalidate with; link-only pages have no text to keep yet
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if self._page_store and with_text and (etag or last_modified):
+            self._page_store.set(key, etag, last_modified, page)
+        return page, None
+    
+    def _extract_text(self, tree, url):
+        """Extract the main text from a parsed page."""
+        # Skip the recall-oriented fallback extractors, which rebuild the
+        # tree and tend to merge list/index page boilerplate into the text
+        return trafilatura.extract(tree, url=url, fast=True, favor_precision=True) or ""
+    
+    def _parse_links(self, tree, url):
+        """Collect absolute anchor targets from a parsed page, honouring <base href>."""
+        base_url = url
+        base = tree.find(".//base[@href]")
+        if base is not None:
+            base_url = urljoin(url, base.get("href").strip())
+        
+        links = []
+        for href in tree.xpath("//a/@href"):
+            href = href.strip()
+            # Skip empty links, fragments, javascript, and mail links
+            if href and not href.startswith(('#', 'javascript:', 'mailto:')):
+                links.append(urljoin(base_url, href))
+        return links
+    
+    def _get_page_text(self, url):
+        """
+        Return a page's main text, downloading it only on a page cache miss.
+        
+        Args:
+            url: Website URL to fetch
+            
+        Returns:
+            Tuple of (text, error); exactly one of them is None
+        """
+        page, error = self._fetch_parsed(url)
+        if error:
+            return None, error
+        if not page.text.strip():
+            return None, f"Error: Could not extract content from {url}"
+        return page.text, None
     
     def _scrape_website(self, url):
         """
@@ -115,25 +573,59 @@ class ResearcherAgent(BaseAgent):
             if not self._is_url(url):
                 return f"Error: '{url}' is not a valid URL."
             
-            # Download content and extract text using trafilatura
-            downloaded = trafilatura.fetch_url(url)
-            if downloaded is None:
-                return f"Error: Could not download content from {url}"
-            
-            text = trafilatura.extract(downloaded)
-            if text is None or text.strip() == "":
-                return f"Error: Could not extract content from {url}"
+            text, error = self._get_page_text(url)
+            if error:
+                return error
             
-            # Limit to a reasonable size for display
-            if len(text) > 2000:
-                text = text[:2000] + "...\n[Content truncated due to size]"
-            
-            return f"Content extracted from {url}:\n\n{text}"
+            return self._format_scrape(url, text)
             
         except Exception as e:
             logger.error(f"Error scraping website {url}: {str(e)}")
             return f"Error scraping website: {str(e)}"
     
+    def _format_scrape(self, url, text):
+        """Format extracted page text for display, truncating long pages."""
+        # Limit to a reasonable size for display
+        if len(text) > 2000:
+            text = text[:2000] + "...\n[Content truncated due to size]"
+        
+        return f"Content extracted from {url}:\n\n{text}"
+    
+    def _fetch_many(self, urls, fetch):
+        """
+        Run a blocking fetch for several URLs concurrently.
+        
+        Downloads are I/O-bound and release the GIL, so a small thread pool
+        overlaps connection setup and server latency across URLs.
+        
+        Args:
+            urls: URLs to fetch
+            fetch: Callable taking a single URL
+            
+        Returns:
+            Results in the same order as urls
+        """
+        workers = min(self._MAX_CONCURRENT_FETCHES, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(fetch, urls))
+    
+    def _scrape_batch(self, urls):
+        """
+        Extract text content from several websites concurrently.
+        
+        Args:
+            urls: Website URLs to scrape
+            
+        Returns:
+            Extracted text content for each URL
+        """
+        # Drop duplicate URLs but keep the order they were given in
+        urls = list(dict.fromkeys(urls))
+        logger.debug(f"Scraping {len(urls)} websites concurrently")
+        
+        results = self._fetch_many(urls, self._scrape_website)
+        return "\n\n---\n\n".join(results)
+    
     def _summarize_text(self, text_or_url):
         """
         Generate a summary of text content.
@@ -149,32 +641,27 @@ class ResearcherAgent(BaseAgent):
             
             # Check if input is a URL
             if self._is_url(text_or_url):
-                # Use scraping to get content
-                content = self._scrape_website(text_or_url)
-                # Extract just the text part (remove the "Content extracted from..." prefix)
-                text = content.split('\n\n', 1)[1] if '\n\n' in content else content
+                text, error = self._get_page_text(text_or_url)
+                if error:
+                    return error
             else:
                 text = text_or_url
             
-            # Very basic summarization technique:
+            # Extractive summarization:
             # 1. Split into sentences
-            sentences = [s.strip() for s in text.replace('\n', ' ').split('.') if s.strip()]
+            sentences = [s for s in _SENT_RE.split(text.strip()) if s.strip()]
             
             # If text is very short, just return it
             if len(sentences) <= 3:
                 return f"Summary:\n\n{text}"
             
-            # 2. Use a simple extractive summarization
-            # - Take the first sentence as it often contains the main idea
-            # - Take a middle sentence for supporting info
-            # - Take the last sentence for conclusion
-            summary_sentences = [
-                sentences[0],
-                sentences[len(sentences) // 2],
-                sentences[-1]
-            ]
+            # 2. Keep the three highest-scoring sentences, in document order
+            scores = self._score_sentences(sentences)
+            top = heapq.nlargest(3, range(len(sentences)), key=scores.__getitem__)
+            summary_sentences = [sentences[i] for i in sorted(top)]
             
-            summary = '. '.join(summary_sentences) + '.'
+            # Sentences keep their own punctuation; only their line breaks are folded
+            summary = ' '.join(' '.join(sentence.split()) for sentence in summary_sentences)
             
             return f"Summary:\n\n{summary}"
             
@@ -182,6 +669,35 @@ class ResearcherAgent(BaseAgent):
             logger.error(f"Error summarizing text: {str(e)}")
             return f"Error summarizing text: {str(e)}"
     
+    def _score_sentences(self, sentences):
+        """
+        Score sentences by TF-IDF, treating each sentence as a document.
+        
+        Args:
+            sentences: List of sentences from one text
+            
+        Returns:
+            List of scores, one per sentence
+        """
+        tokenized = [
+            [w for w in map(str.lower, _WORD_RE.findall(sentence)) if w not in _STOPWORDS]
+            for sentence in sentences
+        ]
+        
+        # Document frequency: number of sentences each word appears in
+        df = Counter()
+        for words in tokenized:
+            df.update(set(words))
+        
+        n = len(sentences)
+        idf = {word: math.log(n / (1 + count)) for word, count in df.items()}
+        
+        scores = []
+        for words in tokenized:
+            tf = Counter(words)
+            scores.append(sum(count * idf[word] for word, count in tf.items()))
+        return scores
+    
     def _extract_links(self, url):
         """
         Extract links from a webpage.
@@ -199,50 +715,21 @@ class ResearcherAgent(BaseAgent):
             if not self._is_url(url):
                 return f"Error: '{url}' is not a valid URL."
             
-            # Request the page
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            page, error = self._fetch_parsed(url, with_text=False)
+            if error:
+                return error
             
-            # Extract links using trafilatura
-            links = trafilatura.extract_metadata(response.text, url=url)
+            if not page.links:
+                return f"No links found on {url}"
             
-            if links and hasattr(links, 'links') and links.links:
-                result = f"Links extracted from {url}:\n\n"
-                for i, link in enumerate(links.links[:20], 1):
-                    result += f"{i}. {link}\n"
-                
-                if len(links.links) > 20:
-                    result += f"\n... and {len(links.links) - 20} more links."
-                
-                return result
-            else:
-                # Fallback to a simple regex-based extraction
-                import re
-                link_pattern = re.compile(r'href=[\'"]?([^\'" >]+)')
-                found_links = link_pattern.findall(response.text)
-                
-                if found_links:
-                    # Filter and clean links
-                    clean_links = []
-                    for link in found_links:
-                        # Convert relative URLs to absolute
-                        if link.startswith('/'):
-                            parsed_base = urlparse(url)
-                            link = f"{parsed_base.scheme}://{parsed_base.netloc}{link}"
-                        # Skip fragments, javascript, and mail links
-                        if not link.startswith(('#', 'javascript:', 'mailto:')):
-                            clean_links.append(link)
-                    
-                    result = f"Links extracted from {url}:\n\n"
-                    for i, link in enumerate(clean_links[:20], 1):
-                        result += f"{i}. {link}\n"
-                    
-                    if len(clean_links) > 20:
-                        result += f"\n... and {len(clean_links) - 20} more links."
-                    
-                    return result
-                else:
-                    return f"No links found on {url}"
+            lines = [f"Links extracted from {url}:", ""]
+            lines.extend(f"{i}. {link}" for i, link in enumerate(page.links[:20], 1))
+            lines.append("")
+            
+            if len(page.links) > 20:
+                lines.append(f"... and {len(page.links) - 20} more links.")
+            
+            return "\n".join(lines)
             
         except Exception as e:
             logger.error(f"Error extracting links from {url}: {str(e)}")
@@ -263,66 +750,58 @@ class ResearcherAgent(BaseAgent):
             
             # Check if input is a URL
             if self._is_url(text_or_url):
-                # Use scraping to get content
-                content = self._scrape_website(text_or_url)
-                # Extract just the text part (remove the "Content extracted from..." prefix)
-                text = content.split('\n\n', 1)[1] if '\n\n' in content else content
+                text, error = self._get_page_text(text_or_url)
+                if error:
+                    return error
             else:
                 text = text_or_url
             
-            # Perform basic text analysis
-            # 1. Word count
-            words = text.split()
-            word_count = len(words)
-            
-            # 2. Character count
-            char_count = len(text)
-            char_count_no_spaces = len(text.replace(" ", ""))
-            
-            # 3. Sentence count
-            sentences = [s for s in text.replace('\n', ' ').split('.') if s.strip()]
-            sentence_count = len(sentences)
-            
-            # 4. Average word length
-            avg_word_length = sum(len(word) for word in words) / max(word_count, 1)
-            
-            # 5. Average sentence length
-            avg_sentence_length = word_count / max(sentence_count, 1)
-            
-            # 6. Simple readability score (higher means more complex)
-            # Using a simplified version of Flesch-Kincaid grade level
-            readability_score = 0.39 * (word_count / max(sentence_count, 1)) + 11.8 * (char_count_no_spaces / max(word_count, 1)) - 15.59
-            
-            # Convert to a 1-10 scale
-            readability_level = min(10, max(1, int(readability_score / 10)))
-            readability_desc = ["Very Easy", "Easy", "Fairly Easy", "Standard", "Fairly Difficult", 
-                               "Difficult", "Very Difficult", "Extremely Difficult", "Academic", "Technical"][readability_level-1]
-            
-            # Common words (most frequent)
-            from collections import Counter
-            # Remove common stop words
-            stop_words = {"the", "to", "and", "a", "in", "it", "is", "of", "that", "for", 
-                         "on", "with", "as", "was", "be", "this", "by", "are", "you", "from"}
-            filtered_words = [word.lower() for word in words if word.lower() not in stop_words and len(word) > 2]
-            common_words = Counter(filtered_words).most_common(5)
-            
-            # Format the results
-            result = "Text Analysis:\n\n"
-            result += f"Word Count: {word_count}\n"
-            result += f"Character Count: {char_count} (without spaces: {char_count_no_spaces})\n"
-            result += f"Sentence Count: {sentence_count}\n"
-            result += f"Average Word Length: {avg_word_length:.2f} characters\n"
-            result += f"Average Sentence Length: {avg_sentence_length:.2f} words\n"
-            result += f"Readability Level: {readability_level}/10 ({readability_desc})\n\n"
-            
-            # List common words if available
-            if common_words:
-                result += "Most Common Words:\n"
-                for word, count in common_words:
-                    result += f"- {word}: {count} occurrences\n"
-            
-            return result
+            return _analyze(text)
             
         except Exception as e:
             logger.error(f"Error analyzing text: {str(e)}")
-            return f"Error analyzing text: {str(e)}"
\ No newline at end of file
+            return f"Error analyzing text: {str(e)}"
+    
+    def _analyze_batch(self, urls):
+        """
+        Analyze the text content of several websites in parallel.
+        
+        Pages are downloaded on the thread pool, then the CPU-bound analysis
+        runs in worker processes so it is not serialized by the GIL.
+        
+        Args:
+            urls: Website URLs to analyze
+            
+        Returns:
+            Analysis results for each URL
+        """
+        try:
+            # Drop duplicate URLs but keep the order they were given in
+            urls = list(dict.fromkeys(urls))
+            logger.debug(f"Analyzing {len(urls)} websites")
+            
+            def fetch(url):
+                if not self._is_url(url):
+                    return None, f"Error: '{url}' is not a valid URL."
+                return self._get_page_text(url)
+            
+            fetched = self._fetch_many(urls, fetch)
+            texts = [text for text, error in fetched if error is None]
+            
+            # A worker pool costs more to start than a single analysis
+            if len(texts) > 1:
+                workers = min(os.cpu_count() or 1, len(texts))
+                chunksize = max(1, len(texts) // (4 * workers))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    analyses = iter(list(pool.map(_analyze, texts, chunksize=chunksize)))
+            else:
+                analyses = map(_analyze, texts)
+            
+            results = []
+            for url, (text, error) in zip(urls, fetched):
+                results.append(error if error else f"Analysis of {url}:\n\n{next(analyses)}")
+            return "\n\n---\n\n".join(results)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing websites: {str(e)}")
+            return f"Error analyzing websites: {str(e)}"
@@ -1,16 +1,573 @@
 import os
 import re
+import time
+import sqlite3
+import bisect
+import hashlib
+import threading
 import subprocess
 import logging
 import json
+import tomllib
 import requests
-from typing import List, Dict, Any, Optional
+import anthropic
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, NamedTuple, Optional
 from agents.base_agent import BaseAgent
 from ai_service import ai_service
 
+# Optional RE2 import: linear-time matching, immune to catastrophic backtracking
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
+_CLAUDE_MODEL = "claude-3-5-sonnet-20241022"
+
+# Expected, short-lived API failures: noted briefly before falling back
+_AI_TRANSIENT_ERRORS = (anthropic.RateLimitError, anthropic.APIConnectionError, anthropic.InternalServerError)
+
+# (connect, read) timeouts for outbound HTTP: an unreachable host fails fast
+# while a slow but live server still gets time to answer
+_HTTP_TIMEOUT = (3, 7)
+
+# OSV vulnerability database, queried per pinned dependency version
+_OSV_QUERY_URL = "https://api.osv.dev/v1/query"
+_OSV_ECOSYSTEMS = {"nodejs": "npm", "python": "PyPI"}
+# Only exact versions can be looked up; ranges like ^1.2 or >=2.0 are skipped
+_EXACT_VERSION_RE = re.compile(r'^(?:==?)?\s*v?(\d+(?:\.[0-9A-Za-z+-]+)*)$')
+# PEP 508 requirement: name, optional [extras], then the version specifier
+# up to any environment marker or comment
+_REQUIREMENT_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*([^;#]*)')
+# Comment after a requirements.txt entry, set off by any whitespace
+_REQUIREMENT_COMMENT_RE = re.compile(r'\s#')
+
+# Larger source files are cut to this many characters before AI analysis
+_AI_MAX_CODE_CHARS = 100_000
+_SCAN_MAX_TOKENS = 2500
+
+_SCAN_PROMPT = """
+You are an expert code analyzer specializing in {language}.
+Perform a detailed security analysis of the provided code.
+Look for:
+- Injection vulnerabilities
+- Authentication issues
+- Authorization flaws
+- Data exposure risks
+- Security misconfigurations
+- Cryptographic failures
+- Business logic vulnerabilities
+
+Provide specific explanations and code examples for remediation.
+Format your response in clear sections with bullet points.
+"""
+
+# scan-code-batch sends files to the model in groups bounded by count and size
+_AI_BATCH_MAX_FILES = 4
+_AI_BATCH_MAX_CHARS = 150_000
+# Sections are matched by file number, which the model echoes more reliably than a path
+_BATCH_RESULT_RE = re.compile(r'^#+\s*RESULTS FOR FILE\s+(\d+)\b.*$', re.MULTILINE | re.IGNORECASE)
+
+_BATCH_SCAN_PROMPT = """
+You are an expert code analyzer specializing in application security.
+Perform a detailed security analysis of each file provided.
+Look for:
+- Injection vulnerabilities
+- Authentication issues
+- Authorization flaws
+- Data exposure risks
+- Security misconfigurations
+- Cryptographic failures
+- Business logic vulnerabilities
+
+Each file starts with a line of the form <<FILE n: path (language)>>,
+where n is the file's number. Answer every file in its own section that
+starts with the line
+## RESULTS FOR FILE n
+using the file's number, followed by the findings for that file only.
+Provide specific explanations and code examples for remediation.
+Format each section with bullet points.
+"""
+
+# Pattern-scan findings are kept for this many distinct file contents
+_FINDINGS_CACHE_SIZE = 512
+
+# AI responses persist here so identical requests across runs skip the API
+_AI_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "security_agent", "ai_responses.sqlite3")
+
+# Static sections of the fallback reports, built once at import
+_SSH_HARDENING = (
+    "SSH Hardening Recommendations:\n\n"
+    "1. Disable root login\n   Edit /etc/ssh/sshd_config and set: PermitRootLogin no\n\n"
+    "2. Use SSH key authentication instead of passwords\n   Generate keys: ssh-keygen -t ed25519\n   Copy to server: ssh-copy-id user@server\n   Disable password auth: PasswordAuthentication no\n\n"
+    "3. Change default SSH port\n   Edit /etc/ssh/sshd_config and set: Port 2222\n\n"
+    "4. Limit user access\n   Edit /etc/ssh/sshd_config and set: AllowUsers user1 user2\n\n"
+    "5. Enable strict mode\n   Edit /etc/ssh/sshd_config and set: StrictModes yes\n\n"
+    "6. Implement idle timeout\n   Edit /etc/ssh/sshd_config and set:\n   ClientAliveInterval 300\n   ClientAliveCountMax 0\n\n"
+    "7. Disable empty passwords\n   Edit /etc/ssh/sshd_config and set: PermitEmptyPasswords no\n\n"
+    "8. Disable X11 forwarding if not needed\n   Edit /etc/ssh/sshd_config and set: X11Forwarding no\n\n"
+)
+
+_FIREWALL_HARDENING = (
+    "Firewall Hardening Recommendations:\n\n"
+    "1. Enable and configure UFW (Uncomplicated Firewall)\n   sudo apt install ufw\n   sudo ufw default deny incoming\n   sudo ufw default allow outgoing\n   sudo ufw allow ssh\n   sudo ufw enable\n\n"
+    "2. Only allow necessary services\n   sudo ufw allow 80/tcp # HTTP\n   sudo ufw allow 443/tcp # HTTPS\n\n"
+    "3. Limit SSH access by IP\n   sudo ufw allow from 192.168.1.0/24 to any port 22\n\n"
+    "4. Enable logging\n   sudo ufw logging on\n\n"
+    "5. Check firewall status\n   sudo ufw status verbose\n\n"
+    "6. Consider iptables for more complex rules\n   sudo apt install iptables-persistent\n\n"
+)
+
+_GENERAL_HARDENING = (
+    "General Linux Hardening Recommendations:\n\n"
+    "1. Keep the system updated\n   sudo apt update && sudo apt upgrade -y\n\n"
+    "2. Enable automatic security updates\n   sudo apt install unattended-upgrades\n   sudo dpkg-reconfigure unattended-upgrades\n\n"
+    "3. Configure a firewall\n   sudo apt install ufw\n   sudo ufw default deny incoming\n   sudo ufw default allow outgoing\n   sudo ufw allow ssh\n   sudo ufw enable\n\n"
+    "4. Secure SSH access\n   Edit /etc/ssh/sshd_config and set:\n   PermitRootLogin no\n   PasswordAuthentication no\n\n"
+    "5. Implement strong password policies\n   sudo apt install libpam-pwquality\n   Edit /etc/security/pwquality.conf\n\n"
+    "6. Disable unnecessary services\n   sudo systemctl disable <service>\n   sudo systemctl stop <service>\n\n"
+    "7. Regularly audit user accounts\n   sudo awk -F: '\\$3 >= 1000 && \\$1 != \"nobody\" {print \\$1}' /etc/passwd\n\n"
+    "8. Implement file system security\n   sudo chmod 644 /etc/passwd\n   sudo chmod 600 /etc/shadow\n\n"
+    "9. Configure system logging\n   sudo apt install rsyslog\n   sudo systemctl enable rsyslog\n\n"
+    "10. Implement regular backups\n    sudo apt install restic\n\n"
+    "11. Install and configure intrusion detection\n    sudo apt install aide\n    sudo aideinit\n\n"
+    "12. Disable USB storage if not needed\n    echo 'blacklist usb-storage' | sudo tee /etc/modprobe.d/disable-usb-storage.conf\n\n"
+)
+
+# Complete fallback answers for the areas with their own recommendations;
+# any other area gets the general text under its own heading
+_HARDENING_BY_AREA = {
+    None: "Linux Hardening Recommendations:\n\n" + _GENERAL_HARDENING,
+    "ssh": "Linux Hardening Recommendations for ssh:\n\n" + _SSH_HARDENING,
+    "firewall": "Linux Hardening Recommendations for firewall:\n\n" + _FIREWALL_HARDENING
+}
+
+# Keyed by lowercased header name to match the normalized response headers:
+# (display name, issue reported when the header is missing)
+_SECURITY_HEADERS = {
+    "strict-transport-security": ("Strict-Transport-Security", "Missing HSTS header which helps protect against SSL strip attacks"),
+    "content-security-policy": ("Content-Security-Policy", "Missing CSP header which helps prevent XSS and data injection attacks"),
+    "x-content-type-options": ("X-Content-Type-Options", "Missing X-Content-Type-Options header which prevents MIME type sniffing"),
+    "x-frame-options": ("X-Frame-Options", "Missing X-Frame-Options header which prevents clickjacking attacks"),
+    "x-xss-protection": ("X-XSS-Protection", "Missing X-XSS-Protection header which enables browser XSS protection")
+}
+
+_OWASP_RECOMMENDATIONS = (
+    "\nKey OWASP Top 10 Security Recommendations:\n"
+    "1. Implement proper input validation and output encoding to prevent injection attacks\n"
+    "2. Use parameterized queries for database operations\n"
+    "3. Implement proper access controls and authentication mechanisms\n"
+    "4. Keep all components and dependencies up to date\n"
+    "5. Implement proper logging and monitoring\n"
+    "6. Use HTTPS with proper TLS configuration\n"
+    "7. Set secure cookie attributes (HttpOnly, Secure, SameSite)\n"
+    "8. Implement proper session management\n"
+    "9. Use Content Security Policy (CSP) to mitigate XSS attacks\n"
+    "10. Validate and sanitize all user inputs\n"
+)
+
+_DEPENDENCY_RECOMMENDATIONS = (
+    "\nRecommendations:\n"
+    "1. Regularly update dependencies to their latest secure versions\n"
+    "2. Consider using tools like npm audit (Node.js) or safety (Python) for vulnerability scanning\n"
+    "3. Implement a dependency lock file to ensure consistent installations\n"
+    "4. Review dependencies for suspicious packages or unused dependencies\n"
+    "5. Consider setting up automatic vulnerability scanning in your CI/CD pipeline\n"
+)
+
+_WEB_REPORT_RECOMMENDATIONS = (
+    "1. Implement security headers (HSTS, CSP, X-Content-Type-Options, etc.)\n"
+    "2. Ensure proper input validation and output encoding\n"
+    "3. Use parameterized queries for database operations\n"
+    "4. Implement proper authentication and session management\n"
+    "5. Keep all components and dependencies up to date\n"
+)
+
+_CODE_REPORT_RECOMMENDATIONS = (
+    "1. Implement secure coding practices\n"
+    "2. Conduct regular code reviews\n"
+    "3. Implement proper input validation and output encoding\n"
+    "4. Use parameterized queries for database operations\n"
+    "5. Keep all dependencies up to date\n"
+)
+
+
+class _ResponseCache:
+    """Persistent SQLite cache of AI responses that expire after a fixed time."""
+    
+    def __init__(self, path, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, created REAL)"
+        )
+        self._conn.commit()
+    
+    def get(self, key):
+        """Return the stored response, or None if it is missing or expired."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created > ?",
+                    (key, time.time() - self.ttl)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading AI response cache: {str(e)}")
+            return None
+        return row[0] if row else None
+    
+    def set(self, key, response):
+        """Store a response, dropping any entries that have expired."""
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, response, now))
+                self._conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing AI response cache: {str(e)}")
+
+
+class _FindingsCache:
+    """In-memory LRU of pattern-scan findings keyed by language and content hash."""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def key(language, code):
+        """Build the cache key for a file's language and full source code."""
+        return language, hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+    
+    def get(self, key):
+        """Return a copy of the stored findings, or None if they are missing."""
+        with self._lock:
+            findings = self._entries.get(key)
+            if findings is None:
+                return None
+            self._entries.move_to_end(key)
+        return list(findings)
+    
+    def set(self, key, findings):
+        """Store findings, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = list(findings)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _PatternSet:
+    """Compiled vulnerability patterns for one check, with an RE2 set prefilter."""
+    
+    def __init__(self, patterns, redact=False, literals=None):
+        # Whether matched lines hold secret values to redact before reporting
+        self.redact = redact
+        # Every pattern needs one of these substrings to match, so code
+        # containing none of them is skipped with plain substring tests
+        self.literals = literals
+        compile_pattern = re2.compile if RE2_AVAILABLE else re.compile
+        self.patterns = [
+            (compile_pattern(pattern), vuln_type, description, recommendation)
+            for pattern, vuln_type, description, recommendation in patterns
+        ]
+        
+        # One RE2 set pass reports which patterns occur at all, so files
+        # with no findings are never scanned pattern by pattern
+        self._set = None
+        if RE2_AVAILABLE:
+            self._set = re2.Set.SearchSet()
+            for pattern, _, _, _ in patterns:
+                self._set.Add(pattern)
+            self._set.Compile()
+    
+    def candidates(self, code):
+        """Return the patterns that match somewhere in code, in table order."""
+        if self.literals and not any(literal in code for literal in self.literals):
+            return []
+        if self._set is None:
+            return self.patterns
+        hits = self._set.Match(code)
+        return [self.patterns[i] for i in sorted(hits)] if hits else []
+
+
+# Vulnerability patterns for the pattern-based fallback scanner, compiled
+# once at import: (pattern, type, description, recommendation).
+# Patterns must also run on the backtracking re module when RE2 is missing,
+# so no quantified class may overlap the one that follows it (a leading \s*
+# before [^)]* made each call site quadratic in its whitespace). Scans for
+# a call's arguments are capped at 500 characters, since an unclosed call
+# would otherwise be rescanned to the end of the file from every later
+# call site.
+_PY_VULN_PATTERNS = _PatternSet([
+    # SQL injection
+    # The literal is consumed up to its first %s only, so runs of %s
+    # cannot be re-split by backtracking
+    (r'cursor\.execute\s*\(\s*[\'"](?:[^\'",%]|%+[^\'",%s])*%+s[^\'",]*[\'"]\s*%\s*\(',
+     "Potential SQL Injection",
+     "String formatting used with SQL queries is vulnerable to SQL injection attacks.",
+     "Use parameterized queries with cursor.execute(query, params) instead of string formatting."),
+    
+    (r'cursor\.execute\s*\(\s*[\'"][^\'",]*\'\s*\+',
+     "Potential SQL Injection",
+     "String concatenation used with SQL queries is vulnerable to SQL injection attacks.",
+     "Use parameterized queries with cursor.execute(query, params) instead of string concatenation."),
+    
+    (r'cursor\.execute\s*\(\s*f[\'"]',
+     "Potential SQL Injection",
+     "f-strings used with SQL queries are vulnerable to SQL injection attacks.",
+     "Use parameterized queries with cursor.execute(query, params) instead of f-strings."),
+    
+    # Command injection
+    (r'os\.system\s*\([^)]{0,500}\+',
+     "Potential Command Injection",
+     "String concatenation used with os.system() is vulnerable to command injection attacks.",
+     "Use subprocess module with shell=False and pass arguments as a list."),
+    
+    (r'os\.system\s*\(\s*f[\'"]',
+     "Potential Command Injection",
+     "f-strings used with os.system() are vulnerable to command injection attacks.",
+     "Use subprocess module with shell=False and pass arguments as a list."),
+    
+    (r'subprocess\.(?:call|run|Popen)\s*\([^)]{0,500}shell\s*=\s*True',
+     "Potential Command Injection",
+     "Using shell=True with subprocess functions is vulnerable to command injection attacks.",
+     "Use shell=False and pass arguments as a list."),
+    
+    # Insecure deserialization
+    (r'pickle\.loads\s*\(',
+     "Potential Insecure Deserialization",
+     "The pickle module is unsafe when used with untrusted data.",
+     "Avoid using pickle with untrusted data. Consider using JSON or other safer serialization formats.")
+], literals=("cursor.execute", "os.system", "subprocess.", "pickle.loads"))
+
+_JS_VULN_PATTERNS = _PatternSet([
+    # Cross-site scripting
+    (r'innerHTML\s*=',
+     "Potential Cross-Site Scripting (XSS)",
+     "Using innerHTML can lead to XSS vulnerabilities if user input is not properly sanitized.",
+     "Use textContent instead, or sanitize input with a library like DOMPurify before using innerHTML."),
+    
+    (r'document\.write\s*\(',
+     "Potential Cross-Site Scripting (XSS)",
+     "Using document.write can lead to XSS vulnerabilities if user input is not properly sanitized.",
+     "Avoid document.write and use safer DOM manipulation methods."),
+    
+    (r'\beval\s*\(',
+     "Potential Injection and XSS",
+     "Using eval() can lead to code injection and XSS vulnerabilities.",
+     "Avoid using eval() and find safer alternatives for the intended functionality.")
+], literals=("innerHTML", "document.write", "eval"))
+
+_PHP_VULN_PATTERNS = _PatternSet([
+    # SQL injection
+    (r'mysqli_query\s*\([^,]{1,500},\s*[\'"][^\'",]*\'\s*\.\s*',
+     "Potential SQL Injection",
+     "String concatenation used with SQL queries is vulnerable to SQL injection attacks.",
+     "Use prepared statements with mysqli_prepare() instead of string concatenation."),
+    
+    (r'mysql_query\s*\(\s*[\'"][^\'",]*\'\s*\.\s*',
+     "Potential SQL Injection",
+     "String concatenation used with mysql_query() is vulnerable to SQL injection attacks.",
+     "Use prepared statements with mysqli_prepare() instead of deprecated mysql_query()."),
+    
+    # Command injection
+    (r'\b(?:system|exec|shell_exec|passthru|proc_open)\s*\([^)]{0,500}\.\s*',
+     "Potential Command Injection",
+     "String concatenation used with command execution functions is vulnerable to command injection attacks.",
+     "Avoid using command execution functions with user input, or properly validate and escape inputs.")
+], literals=("mysql", "system", "exec", "passthru", "proc_open"))
+
+# Only reported when the file never escapes its output
+_PHP_XSS_PATTERNS = _PatternSet([
+    (r'echo\s+\$_(?:GET|POST|REQUEST|COOKIE)',
+     "Potential Cross-Site Scripting (XSS)",
+     "Outputting user input without proper escaping can lead to XSS vulnerabilities.",
+     "Use htmlspecialchars() or htmlentities() to escape user input before outputting it.")
+], literals=("$_GET", "$_POST", "$_REQUEST", "$_COOKIE"))
+
+# Hardcoded secrets, checked for every language that has pattern support
+_SECRET_PATTERNS = _PatternSet([
+    (r'(?i)(?:password|passwd|pwd|token|secret|key|api_key|apikey)\s*=\s*[\'"]+[a-zA-Z0-9]{10,}[\'"]+',
+     "Potential Hardcoded Secret",
+     "Hardcoded secrets found in the code.",
+     "Store secrets in environment variables or a secure vault solution.")
+], redact=True)
+_SECRET_VALUE_RE = re.compile(r'([\'"]+)[a-zA-Z0-9]{10,}([\'"]+)')
+
+
+class Vulnerability(NamedTuple):
+    """A single pattern-scan finding."""
+    type: str
+    description: str
+    line: int
+    code: str
+    recommendation: str
+
+
+def _match_patterns(code, *pattern_sets):
+    """
+    Run precompiled vulnerability patterns over source code.
+    
+    Args:
+        code: Source code to scan
+        *pattern_sets: _PatternSet objects to scan with, in report order
+        
+    Returns:
+        List of Vulnerability tuples, in pattern order, with at most one
+        per line and vulnerability type
+    """
+    vulnerabilities = []
+    # (line, type) pairs already reported, so a line that several patterns
+    # of one type match (or that repeats a match) is reported once
+    seen = set()
+    # Offsets of every newline, built on the first match and shared by
+    # all pattern sets; each match then finds its line by binary search
+    newlines = None
+    
+    for pattern_set in pattern_sets:
+        redact = pattern_set.redact
+        for pattern, vuln_type, description, recommendation in pattern_set.candidates(code):
+            for match in pattern.finditer(code):
+                if newlines is None:
+                    newlines = [m.start() for m in re.finditer('\n', code)]
+                index = bisect.bisect_left(newlines, match.start())
+                line_num = index + 1
+                if (line_num, vuln_type) in seen:
+                    continue
+                seen.add((line_num, vuln_type))
+                line_start = newlines[index - 1] + 1 if index else 0
+                line_end = newlines[index] if index < len(newlines) else len(code)
+                line = code[line_start:line_end].strip()
+                if redact:
+                    # Redact the actual secret from the output
+                    line = _SECRET_VALUE_RE.sub(r'\1[REDACTED]\2', line)
+                vulnerabilities.append(
+                    Vulnerability(vuln_type, description, line_num, line, recommendation)
+                )
+    
+    return vulnerabilities
+
+
+def _find_vulnerabilities(language, code):
+    """
+    Run the pattern checks for a language over its source code.
+    
+    Args:
+        language: Language of the code
+        code: Full source code
+        
+    Returns:
+        List of Vulnerability tuples
+    """
+    if language in ["python", "py"]:
+        return _match_patterns(code, _PY_VULN_PATTERNS, _SECRET_PATTERNS)
+    elif language in ["javascript", "js"]:
+        return _match_patterns(code, _JS_VULN_PATTERNS, _SECRET_PATTERNS)
+    elif language in ["php"]:
+        pattern_sets = [_PHP_VULN_PATTERNS]
+        
+        # Check for XSS vulnerabilities
+        if 'echo' in code and not ('htmlspecialchars' in code or 'htmlentities' in code):
+            pattern_sets.append(_PHP_XSS_PATTERNS)
+        
+        return _match_patterns(code, *pattern_sets)
+    return []
+
+
+def _parse_requirement(requirement):
+    """
+    Split a PEP 508 requirement string into its name and version.
+    
+    Args:
+        requirement: Requirement such as "flask==2.0.1" or "requests[socks]>=2.0"
+        
+    Returns:
+        Tuple of (name, version), where an exact == pin is reduced to the
+        bare version and a missing specifier becomes "latest"; None if the
+        string is not a requirement or names a URL or VCS checkout
+    """
+    # git+https://... and name @ https://... have no version to look up
+    if "://" in requirement or requirement.lstrip().startswith("git+"):
+        return None
+    
+    match = _REQUIREMENT_RE.match(requirement)
+    if not match:
+        return None
+    
+    name = match.group(1)
+    specifier = match.group(2).strip().strip('()').strip()
+    if specifier.startswith("==") and not specifier.startswith("===") and "," not in specifier:
+        specifier = specifier[2:].strip()
+    return name, specifier or "latest"
+
+
+# Language of each supported source file extension (lowercased)
+_LANGUAGE_MAP = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.html': 'html',
+    '.css': 'css',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.java': 'java',
+    '.go': 'go',
+    '.ts': 'typescript',
+    '.cs': 'csharp',
+    '.c': 'c',
+    '.cpp': 'cpp',
+    '.sh': 'bash',
+    '.sql': 'sql',
+    '.md': 'markdown',
+    '.json': 'json',
+    '.xml': 'xml',
+    '.yaml': 'yaml',
+    '.yml': 'yaml'
+}
+
+
+@lru_cache(maxsize=256)
+def _project_type(project_path, mtime_ns):
+    """
+    Detect the type of project based on dependency files.
+    
+    mtime_ns only keys the cache: adding or removing a manifest changes the
+    directory's mtime, so a stale answer is never returned.
+    """
+    if os.path.isfile(project_path):
+        if project_path.endswith("package.json"):
+            return "nodejs"
+        elif project_path.endswith("requirements.txt"):
+            return "python"
+        elif project_path.endswith("pyproject.toml"):
+            return "python"
+        return None
+    
+    # Check for dependency files in directory, listing it once
+    if os.path.isdir(project_path):
+        with os.scandir(project_path) as entries:
+            names = {entry.name for entry in entries}
+        if "package.json" in names:
+            return "nodejs"
+        elif "requirements.txt" in names or "pyproject.toml" in names:
+            return "python"
+    
+    return None
+
+
 class SecurityAgent(BaseAgent):
     """
     The Security Agent - specialized in vulnerability detection and security operations.
@@ -21,10 +578,16 @@ class SecurityAgent(BaseAgent):
     - Checking dependencies for known vulnerabilities
     - Generating security reports
     - Recommending Linux system hardening
+    - Running these checks together as a single audit
     """
     
-    def __init__(self):
-        """Initialize the Security Agent."""
+    def __init__(self, ai_cache_ttl=86400):
+        """
+        Initialize the Security Agent.
+        
+        Args:
+            ai_cache_ttl: Seconds an AI response is reused for identical requests
+        """
         super().__init__(
             name="SecurityAgent",
             description="Specialized in vulnerability detection and security analysis."
@@ -33,6 +596,22 @@ class SecurityAgent(BaseAgent):
             "code", "web", "deps", "system", "network"
         ]
         
+        # Fall back to a per-session cache if the cache directory is unusable
+        try:
+            self._ai_cache = _ResponseCache(_AI_CACHE_PATH, ttl=ai_cache_ttl)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Persistent AI response cache disabled: {str(e)}")
+            self._ai_cache = _ResponseCache(":memory:", ttl=ai_cache_ttl)
+        
+        # Rescans of unchanged files reuse their pattern findings
+        self._findings_cache = _FindingsCache(_FINDINGS_CACHE_SIZE)
+        
+        # Pooled session so concurrent vulnerability lookups reuse connections
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        
     def get_commands(self):
         """Return the commands this agent can handle."""
         return {
@@ -44,6 +623,13 @@ class SecurityAgent(BaseAgent):
                     "scan-code ./webapp/auth.js"
                 ]
             },
+            "scan-code-batch": {
+                "description": "Scan several code files for security vulnerabilities at once",
+                "usage": "scan-code-batch <file_path1> <file_path2> ...",
+                "examples": [
+                    "scan-code-batch main.py ./webapp/auth.js"
+                ]
+            },
             "owasp-check": {
                 "description": "Check a web application against OWASP Top 10 vulnerabilities",
                 "usage": "owasp-check <target_url>",
@@ -77,6 +663,14 @@ class SecurityAgent(BaseAgent):
                     "generate-report myapp.com xss",
                     "generate-report ./src sql-injection"
                 ]
+            },
+            "audit": {
+                "description": "Run the OWASP check, security report and dependency check for a target together",
+                "usage": "audit <target_url> [project_path]",
+                "examples": [
+                    "audit myapp.com",
+                    "audit https://myapp.com ./myproject"
+                ]
             }
         }
     
@@ -88,6 +682,11 @@ class SecurityAgent(BaseAgent):
                     return "Error: Missing file path. Usage: scan-code <file_path>"
                 return self._scan_code(args[0])
                 
+            elif command == "scan-code-batch":
+                if not args:
+                    return "Error: Missing file paths. Usage: scan-code-batch <file_path1> <file_path2> ..."
+                return self._scan_code_batch(args)
+                
             elif command == "owasp-check":
                 if not args:
                     return "Error: Missing target URL. Usage: owasp-check <target_url>"
@@ -109,6 +708,13 @@ class SecurityAgent(BaseAgent):
                 vuln_type = args[1] if len(args) > 1 else None
                 return self._generate_report(target, vuln_type)
                 
+            elif command == "audit":
+                if not args:
+                    return "Error: Missing target URL. Usage: audit <target_url> [project_path]"
+                
+                project_path = args[1] if len(args) > 1 else None
+                return self._audit(args[0], project_path)
+                
             else:
                 return f"Unknown command: '{command}'"
                 
@@ -116,6 +722,45 @@ class SecurityAgent(BaseAgent):
             logger.error(f"Error in SecurityAgent: {str(e)}")
             return f"Error executing command: {str(e)}"
     
+    def _ai_cache_key(self, *parts):
+        """Hash the parts of an AI request into a response cache key."""
+        return hashlib.blake2b("\0".join(map(str, parts)).encode("utf-8")).hexdigest()
+    
+    def _cached_ai_call(self, system_prompt, user_content, max_tokens):
+        """
+        Ask Claude a question, reusing the stored answer for an identical request.
+        
+        Args:
+            system_prompt: System prompt for the request
+            user_content: User message for the request
+            max_tokens: Maximum tokens in the response
+            
+        Returns:
+            Response text
+        """
+        key = self._ai_cache_key(_CLAUDE_MODEL, max_tokens, system_prompt, user_content)
+        cached = self._ai_cache.get(key)
+        if cached is not None:
+            logger.debug("Using cached AI response")
+            return cached
+        
+        ai_analysis = self._ai_call(system_prompt, user_content, max_tokens)
+        self._ai_cache.set(key, ai_analysis)
+        return ai_analysis
+    
+    def _ai_call(self, system_prompt, user_content, max_tokens):
+        """Ask Claude a question and return the response text."""
+        response = ai_service.models['claude'].messages.create(
+            model=_CLAUDE_MODEL,
+            system=system_prompt,
+            messages=[
+                {"role": "user", "content": user_content}
+            ],
+            temperature=0.1,
+            max_tokens=max_tokens
+        )
+        return response.content[0].text
+    
     def _scan_code(self, file_path):
         """
         Scan code for security vulnerabilities.
@@ -130,10 +775,6 @@ class SecurityAgent(BaseAgent):
             return f"Error: File not found: {file_path}"
         
         try:
-            # Read the file
-            with open(file_path, 'r') as f:
-                code = f.read()
-            
             # Determine language from file extension
             _, ext = os.path.splitext(file_path)
             language = self._get_language_from_extension(ext)
@@ -141,51 +782,242 @@ class SecurityAgent(BaseAgent):
             if not language:
                 return f"Error: Unsupported file type: {ext}"
             
+            code, truncated = self._read_code_head(file_path)
+            
             # Try using AI Service first for advanced analysis
             try:
-                logger.debug(f"Using AI Service to scan {language} code for security issues")
-                ai_analysis = ai_service.analyze_code(language, code, analysis_type="security")
-                
-                if ai_analysis and "Error" not in ai_analysis:
-                    result = f"Security Scan Results for {file_path} ({language}):\n\n"
-                    result += ai_analysis
-                    return result
+                if 'claude' in ai_service.models:
+                    logger.debug(f"Using AI Service to scan {language} code for security issues")
+                    ai_analysis = self._cached_ai_call(
+                        _SCAN_PROMPT.format(language=language), code, max_tokens=_SCAN_MAX_TOKENS
+                    )
+                    return f"Security Scan Results for {file_path} ({language}):\n\n{ai_analysis}"
+            except _AI_TRANSIENT_ERRORS as ai_err:
+                logger.info(f"AI Service code security scan unavailable ({type(ai_err).__name__}). Falling back to pattern-based scanning.")
             except Exception as ai_err:
                 logger.warning(f"AI Service code security scan failed: {str(ai_err)}. Falling back to pattern-based scanning.")
             
-            # Fallback to basic pattern matching
-            vulnerabilities = []
-            
-            # Check for common vulnerabilities based on language
-            if language in ["python", "py"]:
-                vulnerabilities.extend(self._check_python_vulnerabilities(code))
-            elif language in ["javascript", "js"]:
-                vulnerabilities.extend(self._check_javascript_vulnerabilities(code))
-            elif language in ["php"]:
-                vulnerabilities.extend(self._check_php_vulnerabilities(code))
-            
-            # Format the result
-            if vulnerabilities:
-                result = f"Security Scan Results for {file_path} ({language}):\n\n"
-                result += "Potential Vulnerabilities Found:\n"
-                for i, vuln in enumerate(vulnerabilities, 1):
-                    result += f"{i}. {vuln['type']}: {vuln['description']}\n"
-                    if 'line' in vuln:
-                        result += f"   Line {vuln['line']}: {vuln['code']}\n"
-                    if 'recommendation' in vuln:
-                        result += f"   Recommendation: {vuln['recommendation']}\n"
-                    result += "\n"
-            else:
-                result = f"Security Scan Results for {file_path} ({language}):\n\n"
-                result += "No obvious security vulnerabilities detected. However, this does not guarantee the code is secure.\n"
-                result += "Consider a more thorough security review with specialized tools."
+            # Fallback to basic pattern matching, over the whole file
+            if truncated:
+                with open(file_path, 'r') as f:
+                    code = f.read()
             
-            return result
+            return self._pattern_scan(file_path, language, code)
             
         except Exception as e:
             logger.error(f"Error scanning code: {str(e)}")
             return f"Error scanning code: {str(e)}"
     
+    def _read_code_head(self, file_path):
+        """
+        Read as much of a source file as AI analysis is sent.
+        
+        The rest of a large file is only read if pattern scanning is needed.
+        
+        Args:
+            file_path: Path to the file to read
+            
+        Returns:
+            Tuple of (code, truncated)
+        """
+        with open(file_path, 'r') as f:
+            code = f.read(_AI_MAX_CODE_CHARS + 1)
+        truncated = len(code) > _AI_MAX_CODE_CHARS
+        if truncated:
+            code = code[:_AI_MAX_CODE_CHARS]
+            logger.debug(f"Sending the first {_AI_MAX_CODE_CHARS} characters of {file_path} for AI analysis")
+        return code, truncated
+    
+    def _pattern_scan(self, file_path, language, code):
+        """
+        Scan code with the pattern-based fallback checks.
+        
+        Args:
+            file_path: Path of the scanned file, for the report header
+            language: Language of the code
+            code: Full source code
+            
+        Returns:
+            Formatted scan results
+        """
+        key = _FindingsCache.key(language, code)
+        vulnerabilities = self._findings_cache.get(key)
+        if vulnerabilities is None:
+            vulnerabilities = _find_vulnerabilities(language, code)
+            self._findings_cache.set(key, vulnerabilities)
+        return self._format_pattern_scan(file_path, language, vulnerabilities)
+    
+    def _format_pattern_scan(self, file_path, language, vulnerabilities):
+        """
+        Format the findings of the pattern-based checks.
+        
+        Args:
+            file_path: Path of the scanned file, for the report header
+            language: Language of the code
+            vulnerabilities: List of Vulnerability tuples
+            
+        Returns:
+            Formatted scan results
+        """
+        parts = [f"Security Scan Results for {file_path} ({language}):\n\n"]
+        if vulnerabilities:
+            parts.append("Potential Vulnerabilities Found:\n")
+            for i, vuln in enumerate(vulnerabilities, 1):
+                parts.append(f"{i}. {vuln.type}: {vuln.description}\n")
+                parts.append(f"   Line {vuln.line}: {vuln.code}\n")
+                parts.append(f"   Recommendation: {vuln.recommendation}\n")
+                parts.append("\n")
+        else:
+            parts.append(
+                "No obvious security vulnerabilities detected. However, this does not guarantee the code is secure.\n"
+                "Consider a more thorough security review with specialized tools."
+            )
+        
+        return "".join(parts)
+    
+    def _scan_code_batch(self, file_paths):
+        """
+        Scan several code files, sharing one AI request per group of files.
+        
+        Files are grouped by _AI_BATCH_MAX_FILES and _AI_BATCH_MAX_CHARS so
+        each request stays within the model's budget; files with a stored
+        analysis skip the request and files the model leaves out fall back
+        to pattern scanning. Batch answers are stored apart from scan-code's,
+        since a section of a batch is not a full single-file analysis.
+        
+        Args:
+            file_paths: Paths of the files to scan
+            
+        Returns:
+            Security analysis of each file
+        """
+        try:
+            # Drop duplicate paths but keep the order they were given in
+            file_paths = list(dict.fromkeys(file_paths))
+            results = {}
+            pending = []
+            
+            for file_path in file_paths:
+                if not os.path.exists(file_path):
+                    results[file_path] = f"Error: File not found: {file_path}"
+                    continue
+                
+                _, ext = os.path.splitext(file_path)
+                language = self._get_language_from_extension(ext)
+                if not language:
+                    results[file_path] = f"Error: Unsupported file type: {ext}"
+                    continue
+                
+                code, truncated = self._read_code_head(file_path)
+                # A scan-code analysis of the same code serves a batch as well
+                ai_analysis = self._ai_cache.get(self._ai_cache_key(
+                    _CLAUDE_MODEL, _SCAN_MAX_TOKENS, _SCAN_PROMPT.format(language=language), code
+                ))
+                cache_key = self._ai_cache_key(_CLAUDE_MODEL, _BATCH_SCAN_PROMPT, language, code)
+                if ai_analysis is None:
+                    ai_analysis = self._ai_cache.get(cache_key)
+                if ai_analysis is not None:
+                    results[file_path] = f"Security Scan Results for {file_path} ({language}):\n\n{ai_analysis}"
+                else:
+                    pending.append((file_path, language, code, truncated, cache_key))
+            
+            if pending and 'claude' in ai_service.models:
+                for group in self._batch_groups(pending):
+                    analyses = self._ai_scan_group(group)
+                    for index, (file_path, language, code, truncated, cache_key) in enumerate(group):
+                        ai_analysis = analyses.get(index)
+                        if ai_analysis:
+                            self._ai_cache.set(cache_key, ai_analysis)
+                            results[file_path] = f"Security Scan Results for {file_path} ({language}):\n\n{ai_analysis}"
+            
+            # Anything the AI did not cover is scanned with patterns, over
+            # whole files; unchanged files reuse their earlier findings
+            jobs = []
+            for file_path, language, code, truncated, cache_key in pending:
+                if file_path in results:
+                    continue
+                if truncated:
+                    with open(file_path, 'r') as f:
+                        code = f.read()
+                key = _FindingsCache.key(language, code)
+                vulnerabilities = self._findings_cache.get(key)
+                if vulnerabilities is None:
+                    jobs.append((file_path, language, code, key))
+                else:
+                    results[file_path] = self._format_pattern_scan(file_path, language, vulnerabilities)
+            
+            languages = [language for _, language, _, _ in jobs]
+            codes = [code for _, _, code, _ in jobs]
+            
+            # A worker pool costs more to start than a single file's scan
+            workers = min(os.cpu_count() or 1, len(jobs))
+            if workers > 1:
+                chunksize = max(1, len(jobs) // (4 * workers))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    findings = list(pool.map(_find_vulnerabilities, languages, codes, chunksize=chunksize))
+            else:
+                findings = map(_find_vulnerabilities, languages, codes)
+            
+            for (file_path, language, _, key), vulnerabilities in zip(jobs, findings):
+                self._findings_cache.set(key, vulnerabilities)
+                results[file_path] = self._format_pattern_scan(file_path, language, vulnerabilities)
+            
+            return "\n\n---\n\n".join(results[file_path] for file_path in file_paths)
+            
+        except Exception as e:
+            logger.error(f"Error scanning code batch: {str(e)}")
+            return f"Error scanning code: {str(e)}"
+    
+    def _batch_groups(self, pending):
+        """Split pending files into groups that fit one AI request."""
+        groups = []
+        group = []
+        size = 0
+        for item in pending:
+            code = item[2]
+            if group and (len(group) == _AI_BATCH_MAX_FILES or size + len(code) > _AI_BATCH_MAX_CHARS):
+                groups.append(group)
+                group = []
+                size = 0
+            group.append(item)
+            size += len(code)
+        if group:
+            groups.append(group)
+        return groups
+    
+    def _ai_scan_group(self, group):
+        """
+        Analyze a group of files in one AI request.
+        
+        Args:
+            group: List of (file_path, language, code, truncated, cache_key)
+            
+        Returns:
+            Dict of position in the group to analysis, for the files the response covers
+        """
+        user_content = "\n".join(
+            f"<<FILE {number}: {file_path} ({language})>>\n{code}"
+            for number, (file_path, language, code, _, _) in enumerate(group, 1)
+        )
+        
+        try:
+            logger.debug(f"Using AI Service to scan {len(group)} files for security issues")
+            response = self._ai_call(_BATCH_SCAN_PROMPT, user_content, max_tokens=min(8000, 2000 * len(group)))
+        except _AI_TRANSIENT_ERRORS as ai_err:
+            logger.info(f"AI Service batch code scan unavailable ({type(ai_err).__name__}). Falling back to pattern-based scanning.")
+            return {}
+        except Exception as ai_err:
+            logger.warning(f"AI Service batch code scan failed: {str(ai_err)}. Falling back to pattern-based scanning.")
+            return {}
+        
+        # split() alternates text with captured numbers: [preamble, number, body, number, body, ...]
+        parts = _BATCH_RESULT_RE.split(response)
+        return {
+            int(number) - 1: body.strip()
+            for number, body in zip(parts[1::2], parts[2::2])
+            if 1 <= int(number) <= len(group)
+        }
+    
     def _owasp_check(self, target_url):
         """
         Check a web application against OWASP Top 10 vulnerabilities.
@@ -233,77 +1065,86 @@ class SecurityAgent(BaseAgent):
                 # Use AI service to generate the analysis
                 if 'claude' in ai_service.models:
                     logger.debug(f"Using AI Service to analyze OWASP risks for {target_url}")
-                    response = ai_service.models['claude'].messages.create(
-                        model="claude-3-5-sonnet-20241022",  # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-                        system=system_prompt,
-                        messages=[
-                            {"role": "user", "content": f"Please provide an OWASP Top 10 security assessment for {target_url}"}
-                        ],
-                        temperature=0.1,
+                    ai_analysis = self._cached_ai_call(
+                        system_prompt,
+                        f"Please provide an OWASP Top 10 security assessment for {target_url}",
                         max_tokens=2500
                     )
-                    ai_analysis = response.content[0].text
                 
-                result = f"OWASP Top 10 Security Assessment for {target_url}:\n\n"
-                result += ai_analysis
-                return result
+                return f"OWASP Top 10 Security Assessment for {target_url}:\n\n{ai_analysis}"
                 
+            except _AI_TRANSIENT_ERRORS as ai_err:
+                logger.info(f"AI Service OWASP analysis unavailable ({type(ai_err).__name__}). Falling back to basic checks.")
             except Exception as ai_err:
                 logger.warning(f"AI Service OWASP analysis failed: {str(ai_err)}. Falling back to basic checks.")
             
             # Basic security checks as fallback
-            result = f"OWASP Top 10 Security Assessment for {target_url}:\n\n"
-            result += "Note: This is a basic assessment. A comprehensive security audit would require detailed testing.\n\n"
-            
-            # Try to fetch the URL to check basic security headers
-            try:
-                response = requests.get(target_url, timeout=10)
-                headers = response.headers
-                
-                # Check security headers
-                security_headers = {
-                    "Strict-Transport-Security": "Missing HSTS header which helps protect against SSL strip attacks",
-                    "Content-Security-Policy": "Missing CSP header which helps prevent XSS and data injection attacks",
-                    "X-Content-Type-Options": "Missing X-Content-Type-Options header which prevents MIME type sniffing",
-                    "X-Frame-Options": "Missing X-Frame-Options header which prevents clickjacking attacks",
-                    "X-XSS-Protection": "Missing X-XSS-Protection header which enables browser XSS protection"
-                }
-                
-                result += "Security Headers Analysis:\n"
-                for header, issue in security_headers.items():
-                    if header not in headers:
-                        result += f"- {issue}\n"
-                    else:
-                        result += f"+ {header} is properly configured\n"
-                
-                # Check if using HTTPS
-                if target_url.startswith("http://"):
-                    result += "- Site is not using HTTPS which exposes data to man-in-the-middle attacks\n"
-                else:
-                    result += "+ Site is using HTTPS\n"
-                    
-            except requests.exceptions.RequestException as req_err:
-                result += f"Unable to connect to {target_url}: {str(req_err)}\n"
-            
-            # Add general recommendations
-            result += "\nKey OWASP Top 10 Security Recommendations:\n"
-            result += "1. Implement proper input validation and output encoding to prevent injection attacks\n"
-            result += "2. Use parameterized queries for database operations\n"
-            result += "3. Implement proper access controls and authentication mechanisms\n"
-            result += "4. Keep all components and dependencies up to date\n"
-            result += "5. Implement proper logging and monitoring\n"
-            result += "6. Use HTTPS with proper TLS configuration\n"
-            result += "7. Set secure cookie attributes (HttpOnly, Secure, SameSite)\n"
-            result += "8. Implement proper session management\n"
-            result += "9. Use Content Security Policy (CSP) to mitigate XSS attacks\n"
-            result += "10. Validate and sanitize all user inputs\n"
-            
-            return result
+            return self._basic_owasp_check(target_url)
             
         except Exception as e:
             logger.error(f"Error performing OWASP check: {str(e)}")
             return f"Error performing OWASP check: {str(e)}"
     
+    def _basic_owasp_check(self, target_url):
+        """
+        Check a web application's security headers without the AI service.
+        
+        Args:
+            target_url: URL of the target web application
+            
+        Returns:
+            Basic OWASP security assessment
+        """
+        parts = [
+            f"OWASP Top 10 Security Assessment for {target_url}:\n\n",
+            "Note: This is a basic assessment. A comprehensive security audit would require detailed testing.\n\n"
+        ]
+        
+        # Try to fetch the URL to check basic security headers
+        try:
+            headers = self._fetch_headers(target_url)
+            # Header names are case-insensitive (and lowercase over HTTP/2)
+            present = {name.lower() for name in headers}
+            
+            # Check security headers
+            parts.append("Security Headers Analysis:\n")
+            for key, (header, issue) in _SECURITY_HEADERS.items():
+                if key not in present:
+                    parts.append(f"- {issue}\n")
+                else:
+                    parts.append(f"+ {header} is properly configured\n")
+            
+            # Check if using HTTPS
+            if target_url.startswith("http://"):
+                parts.append("- Site is not using HTTPS which exposes data to man-in-the-middle attacks\n")
+            else:
+                parts.append("+ Site is using HTTPS\n")
+                
+        except requests.exceptions.RequestException as req_err:
+            parts.append(f"Unable to connect to {target_url}: {str(req_err)}\n")
+        
+        # Add general recommendations
+        parts.append(_OWASP_RECOMMENDATIONS)
+        
+        return "".join(parts)
+    
+    def _fetch_headers(self, url):
+        """
+        Fetch a URL's response headers without downloading its body.
+        
+        Args:
+            url: URL to request
+            
+        Returns:
+            Response headers
+        """
+        response = self._session.head(url, timeout=_HTTP_TIMEOUT, allow_redirects=True)
+        if response.status_code in (405, 501):
+            # HEAD not supported; a streamed GET closed unread sends the same headers
+            with self._session.get(url, timeout=_HTTP_TIMEOUT, stream=True) as response:
+                return response.headers
+        return response.headers
+    
     def _check_dependencies(self, project_path):
         """
         Check project dependencies for known vulnerabilities.
@@ -349,44 +1190,108 @@ class SecurityAgent(BaseAgent):
                 
                 if 'claude' in ai_service.models:
                     logger.debug(f"Using AI Service to analyze dependencies for {project_path}")
-                    response = ai_service.models['claude'].messages.create(
-                        model="claude-3-5-sonnet-20241022",  # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-                        system=system_prompt,
-                        messages=[
-                            {"role": "user", "content": f"Please analyze these {project_type} dependencies for potential security issues:\n```json\n{dependencies_str}\n```"}
-                        ],
-                        temperature=0.1,
+                    ai_analysis = self._cached_ai_call(
+                        system_prompt,
+                        f"Please analyze these {project_type} dependencies for potential security issues:\n```json\n{dependencies_str}\n```",
                         max_tokens=2000
                     )
-                    ai_analysis = response.content[0].text
                     
-                    result = f"Dependency Security Analysis for {project_path} ({project_type}):\n\n"
-                    result += ai_analysis
-                    return result
+                    return f"Dependency Security Analysis for {project_path} ({project_type}):\n\n{ai_analysis}"
                     
+            except _AI_TRANSIENT_ERRORS as ai_err:
+                logger.info(f"AI Service dependency analysis unavailable ({type(ai_err).__name__}). Falling back to basic analysis.")
             except Exception as ai_err:
                 logger.warning(f"AI Service dependency analysis failed: {str(ai_err)}. Falling back to basic analysis.")
             
             # Basic dependency analysis as fallback
-            result = f"Dependency Security Analysis for {project_path} ({project_type}):\n\n"
-            result += f"Found {len(dependencies)} dependencies:\n\n"
-            
-            for i, (name, version) in enumerate(dependencies.items(), 1):
-                result += f"{i}. {name}: {version}\n"
-            
-            result += "\nRecommendations:\n"
-            result += "1. Regularly update dependencies to their latest secure versions\n"
-            result += "2. Consider using tools like npm audit (Node.js) or safety (Python) for vulnerability scanning\n"
-            result += "3. Implement a dependency lock file to ensure consistent installations\n"
-            result += "4. Review dependencies for suspicious packages or unused dependencies\n"
-            result += "5. Consider setting up automatic vulnerability scanning in your CI/CD pipeline\n"
-            
-            return result
+            return self._basic_dependency_analysis(project_path, project_type, dependencies)
             
         except Exception as e:
             logger.error(f"Error checking dependencies: {str(e)}")
             return f"Error checking dependencies: {str(e)}"
     
+    def _basic_dependency_analysis(self, project_path, project_type, dependencies):
+        """
+        List dependencies with their known OSV vulnerabilities, without the AI service.
+        
+        Args:
+            project_path: Path to the project directory or dependency file
+            project_type: Project type from _detect_project_type
+            dependencies: Dict of dependency name to version specifier
+            
+        Returns:
+            Basic dependency analysis
+        """
+        parts = [
+            f"Dependency Security Analysis for {project_path} ({project_type}):\n\n",
+            f"Found {len(dependencies)} dependencies:\n\n"
+        ]
+        
+        known_vulns = self._lookup_vulnerabilities(dependencies, project_type)
+        
+        for i, (name, version) in enumerate(dependencies.items(), 1):
+            parts.append(f"{i}. {name}: {version}\n")
+            if known_vulns.get(name):
+                parts.append(f"   Known vulnerabilities: {', '.join(known_vulns[name])}\n")
+        
+        if known_vulns:
+            affected = sum(1 for vulns in known_vulns.values() if vulns)
+            parts.append(f"\nChecked {len(known_vulns)} pinned dependencies against the OSV database: {affected} with known vulnerabilities.\n")
+        
+        parts.append(_DEPENDENCY_RECOMMENDATIONS)
+        
+        return "".join(parts)
+    
+    def _lookup_vulnerabilities(self, dependencies, project_type):
+        """
+        Look up pinned dependency versions in the OSV database concurrently.
+        
+        Args:
+            dependencies: Dict of dependency name to version specifier
+            project_type: Project type from _detect_project_type
+            
+        Returns:
+            Dict of dependency name to list of vulnerability IDs, for the
+            dependencies that were pinned and looked up successfully
+        """
+        ecosystem = _OSV_ECOSYSTEMS.get(project_type)
+        pinned = []
+        for name, version in dependencies.items():
+            match = _EXACT_VERSION_RE.match(str(version).strip())
+            if ecosystem and match:
+                pinned.append((name, match.group(1)))
+        
+        if not pinned:
+            return {}
+        
+        def query(dependency):
+            name, version = dependency
+            return name, self._query_osv(name, version, ecosystem)
+        
+        # Lookups are network-bound, so threads overlap their latency
+        with ThreadPoolExecutor(max_workers=min(16, len(pinned))) as pool:
+            results = pool.map(query, pinned)
+        return {name: vulns for name, vulns in results if vulns is not None}
+    
+    def _query_osv(self, name, version, ecosystem):
+        """
+        Query the OSV database for known vulnerabilities in one package version.
+        
+        Returns:
+            List of vulnerability IDs, or None if the lookup failed
+        """
+        try:
+            response = self._session.post(
+                _OSV_QUERY_URL,
+                json={"package": {"name": name, "ecosystem": ecosystem}, "version": version},
+                timeout=_HTTP_TIMEOUT
+            )
+            response.raise_for_status()
+            return [vuln["id"] for vuln in response.json().get("vulns", [])]
+        except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+            logger.warning(f"OSV lookup failed for {name} {version}: {str(e)}")
+            return None
+    
     def _harden_linux(self, area=None):
         """
         Provide recommendations for hardening a Linux system.
@@ -398,6 +1303,10 @@ class SecurityAgent(BaseAgent):
             Linux hardening recommendations
         """
         try:
+            heading = "Linux Hardening Recommendations"
+            if area:
+                heading += f" for {area}"
+            
             # Use AI service for detailed hardening recommendations
             if area:
                 query = f"Provide detailed Linux hardening recommendations for {area}"
@@ -420,70 +1329,19 @@ class SecurityAgent(BaseAgent):
                 
                 if 'claude' in ai_service.models:
                     logger.debug(f"Using AI Service to generate Linux hardening recommendations")
-                    response = ai_service.models['claude'].messages.create(
-                        model="claude-3-5-sonnet-20241022",  # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-                        system=system_prompt,
-                        messages=[
-                            {"role": "user", "content": query}
-                        ],
-                        temperature=0.1,
-                        max_tokens=2500
-                    )
-                    ai_analysis = response.content[0].text
+                    ai_analysis = self._cached_ai_call(system_prompt, query, max_tokens=2500)
                     
-                    result = f"Linux Hardening Recommendations"
-                    if area:
-                        result += f" for {area}"
-                    result += ":\n\n"
-                    result += ai_analysis
-                    return result
+                    return f"{heading}:\n\n{ai_analysis}"
                     
+            except _AI_TRANSIENT_ERRORS as ai_err:
+                logger.info(f"AI Service hardening recommendations unavailable ({type(ai_err).__name__}). Falling back to basic recommendations.")
             except Exception as ai_err:
                 logger.warning(f"AI Service hardening recommendations failed: {str(ai_err)}. Falling back to basic recommendations.")
             
             # Basic hardening recommendations as fallback
-            result = f"Linux Hardening Recommendations"
-            if area:
-                result += f" for {area}"
-            result += ":\n\n"
-            
-            if area == "ssh":
-                result += "SSH Hardening Recommendations:\n\n"
-                result += "1. Disable root login\n   Edit /etc/ssh/sshd_config and set: PermitRootLogin no\n\n"
-                result += "2. Use SSH key authentication instead of passwords\n   Generate keys: ssh-keygen -t ed25519\n   Copy to server: ssh-copy-id user@server\n   Disable password auth: PasswordAuthentication no\n\n"
-                result += "3. Change default SSH port\n   Edit /etc/ssh/sshd_config and set: Port 2222\n\n"
-                result += "4. Limit user access\n   Edit /etc/ssh/sshd_config and set: AllowUsers user1 user2\n\n"
-                result += "5. Enable strict mode\n   Edit /etc/ssh/sshd_config and set: StrictModes yes\n\n"
-                result += "6. Implement idle timeout\n   Edit /etc/ssh/sshd_config and set:\n   ClientAliveInterval 300\n   ClientAliveCountMax 0\n\n"
-                result += "7. Disable empty passwords\n   Edit /etc/ssh/sshd_config and set: PermitEmptyPasswords no\n\n"
-                result += "8. Disable X11 forwarding if not needed\n   Edit /etc/ssh/sshd_config and set: X11Forwarding no\n\n"
-            
-            elif area == "firewall":
-                result += "Firewall Hardening Recommendations:\n\n"
-                result += "1. Enable and configure UFW (Uncomplicated Firewall)\n   sudo apt install ufw\n   sudo ufw default deny incoming\n   sudo ufw default allow outgoing\n   sudo ufw allow ssh\n   sudo ufw enable\n\n"
-                result += "2. Only allow necessary services\n   sudo ufw allow 80/tcp # HTTP\n   sudo ufw allow 443/tcp # HTTPS\n\n"
-                result += "3. Limit SSH access by IP\n   sudo ufw allow from 192.168.1.0/24 to any port 22\n\n"
-                result += "4. Enable logging\n   sudo ufw logging on\n\n"
-                result += "5. Check firewall status\n   sudo ufw status verbose\n\n"
-                result += "6. Consider iptables for more complex rules\n   sudo apt install iptables-persistent\n\n"
-            
-            else:
-                # General hardening recommendations
-                result += "General Linux Hardening Recommendations:\n\n"
-                result += "1. Keep the system updated\n   sudo apt update && sudo apt upgrade -y\n\n"
-                result += "2. Enable automatic security updates\n   sudo apt install unattended-upgrades\n   sudo dpkg-reconfigure unattended-upgrades\n\n"
-                result += "3. Configure a firewall\n   sudo apt install ufw\n   sudo ufw default deny incoming\n   sudo ufw default allow outgoing\n   sudo ufw allow ssh\n   sudo ufw enable\n\n"
-                result += "4. Secure SSH access\n   Edit /etc/ssh/sshd_config and set:\n   PermitRootLogin no\n   PasswordAuthentication no\n\n"
-                result += "5. Implement strong password policies\n   sudo apt install libpam-pwquality\n   Edit /etc/security/pwquality.conf\n\n"
-                result += "6. Disable unnecessary services\n   sudo systemctl disable <service>\n   sudo systemctl stop <service>\n\n"
-                result += "7. Regularly audit user accounts\n   sudo awk -F: '\\$3 >= 1000 && \\$1 != \"nobody\" {print \\$1}' /etc/passwd\n\n"
-                result += "8. Implement file system security\n   sudo chmod 644 /etc/passwd\n   sudo chmod 600 /etc/shadow\n\n"
-                result += "9. Configure system logging\n   sudo apt install rsyslog\n   sudo systemctl enable rsyslog\n\n"
-                result += "10. Implement regular backups\n    sudo apt install restic\n\n"
-                result += "11. Install and configure intrusion detection\n    sudo apt install aide\n    sudo aideinit\n\n"
-                result += "12. Disable USB storage if not needed\n    echo 'blacklist usb-storage' | sudo tee /etc/modprobe.d/disable-usb-storage.conf\n\n"
-            
-            return result
+            if area in _HARDENING_BY_AREA:
+                return _HARDENING_BY_AREA[area]
+            return f"{heading}:\n\n{_GENERAL_HARDENING}"
             
         except Exception as e:
             logger.error(f"Error generating hardening recommendations: {str(e)}")
@@ -573,355 +1431,124 @@ class SecurityAgent(BaseAgent):
             try:
                 if 'claude' in ai_service.models:
                     logger.debug(f"Using AI Service to generate security report for {target}")
-                    response = ai_service.models['claude'].messages.create(
-                        model="claude-3-5-sonnet-20241022",  # the newest Anthropic model is "claude-3-5-sonnet-20241022" which was released October 22, 2024
-                        system=system_prompt,
-                        messages=[
-                            {"role": "user", "content": query}
-                        ],
-                        temperature=0.1,
-                        max_tokens=3000
-                    )
-                    ai_analysis = response.content[0].text
+                    ai_analysis = self._cached_ai_call(system_prompt, query, max_tokens=3000)
                     
-                    result = f"{title}\n{'=' * len(title)}\n\n"
-                    result += ai_analysis
-                    return result
+                    return f"{title}\n{'=' * len(title)}\n\n{ai_analysis}"
                     
+            except _AI_TRANSIENT_ERRORS as ai_err:
+                logger.info(f"AI Service report generation unavailable ({type(ai_err).__name__}). Falling back to template report.")
             except Exception as ai_err:
                 logger.warning(f"AI Service report generation failed: {str(ai_err)}. Falling back to template report.")
             
             # Basic report template as fallback
-            result = f"{title}\n{'=' * len(title)}\n\n"
-            
-            result += "EXECUTIVE SUMMARY\n----------------\n\n"
-            result += f"This report presents the findings of a security assessment conducted for {target}. "
-            if vuln_type:
-                result += f"The assessment focused specifically on {vuln_type} vulnerabilities. "
-            result += "The purpose of this assessment was to identify security vulnerabilities and provide recommendations for remediation.\n\n"
-            
-            result += "METHODOLOGY\n-----------\n\n"
-            if is_url:
-                result += "The assessment was conducted using a combination of automated scanning tools and manual testing techniques. "
-                result += "The methodology followed industry best practices for web application security testing.\n\n"
-            else:
-                result += "The assessment was conducted using static code analysis techniques. "
-                result += "The methodology followed industry best practices for secure code review.\n\n"
-            
-            result += "FINDINGS\n--------\n\n"
-            result += "Due to the limited scope of this automated report, a full security assessment could not be performed. "
-            result += "It is recommended to conduct a comprehensive security assessment with specialized tools and manual testing.\n\n"
-            
-            result += "RECOMMENDATIONS\n---------------\n\n"
-            
-            if is_url:
-                result += "1. Implement security headers (HSTS, CSP, X-Content-Type-Options, etc.)\n"
-                result += "2. Ensure proper input validation and output encoding\n"
-                result += "3. Use parameterized queries for database operations\n"
-                result += "4. Implement proper authentication and session management\n"
-                result += "5. Keep all components and dependencies up to date\n"
-            else:
-                result += "1. Implement secure coding practices\n"
-                result += "2. Conduct regular code reviews\n"
-                result += "3. Implement proper input validation and output encoding\n"
-                result += "4. Use parameterized queries for database operations\n"
-                result += "5. Keep all dependencies up to date\n"
-            
-            result += "\nCONCLUSION\n----------\n\n"
-            result += "This automated report provides a starting point for improving the security of "
-            if is_url:
-                result += f"the web application at {target}. "
-            else:
-                result += f"the code at {target}. "
-            result += "For a comprehensive security assessment, it is recommended to engage with specialized security professionals.\n"
-            
-            return result
+            return self._template_report(target, vuln_type, title, is_url)
             
         except Exception as e:
             logger.error(f"Error generating report: {str(e)}")
             return f"Error generating report: {str(e)}"
     
-    def _get_language_from_extension(self, ext):
-        """Determine language from file extension."""
-        ext = ext.lower()
-        
-        language_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.html': 'html',
-            '.css': 'css',
-            '.php': 'php',
-            '.rb': 'ruby',
-            '.java': 'java',
-            '.go': 'go',
-            '.ts': 'typescript',
-            '.cs': 'csharp',
-            '.c': 'c',
-            '.cpp': 'cpp',
-            '.sh': 'bash',
-            '.sql': 'sql',
-            '.md': 'markdown',
-            '.json': 'json',
-            '.xml': 'xml',
-            '.yaml': 'yaml',
-            '.yml': 'yaml'
-        }
+    def _template_report(self, target, vuln_type, title, is_url):
+        """
+        Fill in the static security report template, without the AI service.
         
-        return language_map.get(ext)
-    
-    def _check_python_vulnerabilities(self, code):
-        """Check Python code for common security vulnerabilities."""
-        vulnerabilities = []
-        
-        # Check for SQL injection vulnerabilities
-        sql_patterns = [
-            (r'cursor\.execute\s*\(\s*[\'"][^\'",]*%s[^\'",]*[\'"]\s*%\s*\(', 
-             "Potential SQL Injection",
-             "String formatting used with SQL queries is vulnerable to SQL injection attacks.",
-             "Use parameterized queries with cursor.execute(query, params) instead of string formatting."),
-            
-            (r'cursor\.execute\s*\(\s*[\'"][^\'",]*\'\s*\+', 
-             "Potential SQL Injection",
-             "String concatenation used with SQL queries is vulnerable to SQL injection attacks.",
-             "Use parameterized queries with cursor.execute(query, params) instead of string concatenation."),
-             
-            (r'cursor\.execute\s*\(\s*f[\'"]', 
-             "Potential SQL Injection",
-             "f-strings used with SQL queries are vulnerable to SQL injection attacks.",
-             "Use parameterized queries with cursor.execute(query, params) instead of f-strings.")
+        Args:
+            target: Target the report is for (URL or path)
+            vuln_type: Specific vulnerability type to focus on (optional)
+            title: Report title
+            is_url: Whether the target is a web application
+            
+        Returns:
+            Template security report
+        """
+        parts = [
+            f"{title}\n{'=' * len(title)}\n\n",
+            "EXECUTIVE SUMMARY\n----------------\n\n",
+            f"This report presents the findings of a security assessment conducted for {target}. "
         ]
+        if vuln_type:
+            parts.append(f"The assessment focused specifically on {vuln_type} vulnerabilities. ")
+        parts.append("The purpose of this assessment was to identify security vulnerabilities and provide recommendations for remediation.\n\n")
         
-        for pattern, vuln_type, description, recommendation in sql_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': recommendation
-                })
-        
-        # Check for command injection vulnerabilities
-        cmd_patterns = [
-            (r'os\.system\s*\(\s*[^)]*\+', 
-             "Potential Command Injection",
-             "String concatenation used with os.system() is vulnerable to command injection attacks.",
-             "Use subprocess module with shell=False and pass arguments as a list."),
-             
-            (r'os\.system\s*\(\s*f[\'"]', 
-             "Potential Command Injection",
-             "f-strings used with os.system() are vulnerable to command injection attacks.",
-             "Use subprocess module with shell=False and pass arguments as a list."),
-             
-            (r'subprocess\.(?:call|run|Popen)\s*\([^)]*shell\s*=\s*True', 
-             "Potential Command Injection",
-             "Using shell=True with subprocess functions is vulnerable to command injection attacks.",
-             "Use shell=False and pass arguments as a list.")
-        ]
+        parts.append("METHODOLOGY\n-----------\n\n")
+        if is_url:
+            parts.append(
+                "The assessment was conducted using a combination of automated scanning tools and manual testing techniques. "
+                "The methodology followed industry best practices for web application security testing.\n\n"
+            )
+        else:
+            parts.append(
+                "The assessment was conducted using static code analysis techniques. "
+                "The methodology followed industry best practices for secure code review.\n\n"
+            )
         
-        for pattern, vuln_type, description, recommendation in cmd_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': recommendation
-                })
-        
-        # Check for pickle security issues
-        if 'pickle.loads' in code:
-            matches = re.finditer(r'pickle\.loads\s*\(', code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': "Potential Insecure Deserialization",
-                    'description': "The pickle module is unsafe when used with untrusted data.",
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': "Avoid using pickle with untrusted data. Consider using JSON or other safer serialization formats."
-                })
-        
-        # Check for hardcoded secrets
-        secret_patterns = [
-            (r'(?:password|passwd|pwd|token|secret|key|api_key|apikey)\s*=\s*[\'"]+[a-zA-Z0-9]{10,}[\'"]+', 
-             "Potential Hardcoded Secret",
-             "Hardcoded secrets found in the code.",
-             "Store secrets in environment variables or a secure vault solution.")
-        ]
+        parts.append(
+            "FINDINGS\n--------\n\n"
+            "Due to the limited scope of this automated report, a full security assessment could not be performed. "
+            "It is recommended to conduct a comprehensive security assessment with specialized tools and manual testing.\n\n"
+        )
+        
+        parts.append("RECOMMENDATIONS\n---------------\n\n")
+        parts.append(_WEB_REPORT_RECOMMENDATIONS if is_url else _CODE_REPORT_RECOMMENDATIONS)
+        
+        parts.append("\nCONCLUSION\n----------\n\n")
+        parts.append("This automated report provides a starting point for improving the security of ")
+        if is_url:
+            parts.append(f"the web application at {target}. ")
+        else:
+            parts.append(f"the code at {target}. ")
+        parts.append("For a comprehensive security assessment, it is recommended to engage with specialized security professionals.\n")
         
-        for pattern, vuln_type, description, recommendation in secret_patterns:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                # Redact the actual secret from the output
-                redacted_line = re.sub(r'([\'"]+)[a-zA-Z0-9]{10,}([\'"]+)', r'\1[REDACTED]\2', line)
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': redacted_line,
-                    'recommendation': recommendation
-                })
-        
-        return vulnerabilities
+        return "".join(parts)
     
-    def _check_javascript_vulnerabilities(self, code):
-        """Check JavaScript code for common security vulnerabilities."""
-        vulnerabilities = []
+    def _audit(self, target_url, project_path=None):
+        """
+        Run the checks for one target concurrently and combine their results.
         
-        # Check for XSS vulnerabilities
-        xss_patterns = [
-            (r'innerHTML\s*=', 
-             "Potential Cross-Site Scripting (XSS)",
-             "Using innerHTML can lead to XSS vulnerabilities if user input is not properly sanitized.",
-             "Use textContent instead, or sanitize input with a library like DOMPurify before using innerHTML."),
-             
-            (r'document\.write\s*\(', 
-             "Potential Cross-Site Scripting (XSS)",
-             "Using document.write can lead to XSS vulnerabilities if user input is not properly sanitized.",
-             "Avoid document.write and use safer DOM manipulation methods."),
-             
-            (r'eval\s*\(', 
-             "Potential Injection and XSS",
-             "Using eval() can lead to code injection and XSS vulnerabilities.",
-             "Avoid using eval() and find safer alternatives for the intended functionality.")
-        ]
+        Each check waits mostly on its own AI request, so running them on
+        threads overlaps that latency instead of paying it once per check.
         
-        for pattern, vuln_type, description, recommendation in xss_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': recommendation
-                })
-        
-        # Check for hardcoded secrets
-        secret_patterns = [
-            (r'(?:password|passwd|pwd|token|secret|key|api_key|apikey)\s*=\s*[\'"]+[a-zA-Z0-9]{10,}[\'"]+', 
-             "Potential Hardcoded Secret",
-             "Hardcoded secrets found in the code.",
-             "Store secrets in environment variables or a secure vault solution.")
+        Args:
+            target_url: URL of the target web application
+            project_path: Path to the project's dependencies (optional)
+            
+        Returns:
+            The results of each check, in a fixed order
+        """
+        checks = [
+            (self._owasp_check, target_url),
+            (self._generate_report, target_url)
         ]
+        if project_path:
+            checks.append((self._check_dependencies, project_path))
         
-        for pattern, vuln_type, description, recommendation in secret_patterns:
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                # Redact the actual secret from the output
-                redacted_line = re.sub(r'([\'"]+)[a-zA-Z0-9]{10,}([\'"]+)', r'\1[REDACTED]\2', line)
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': redacted_line,
-                    'recommendation': recommendation
-                })
-        
-        return vulnerabilities
+        # Every check returns its own error text rather than raising
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            futures = [pool.submit(check, arg) for check, arg in checks]
+            return "\n\n---\n\n".join(future.result() for future in futures)
+    
+    def _get_language_from_extension(self, ext):
+        """Determine language from file extension."""
+        return _LANGUAGE_MAP.get(ext.lower())
+    
+    def _check_python_vulnerabilities(self, code):
+        """Check Python code for common security vulnerabilities."""
+        return _find_vulnerabilities("python", code)
+    
+    def _check_javascript_vulnerabilities(self, code):
+        """Check JavaScript code for common security vulnerabilities."""
+        return _find_vulnerabilities("javascript", code)
     
     def _check_php_vulnerabilities(self, code):
         """Check PHP code for common security vulnerabilities."""
-        vulnerabilities = []
-        
-        # Check for SQL injection vulnerabilities
-        sql_patterns = [
-            (r'mysqli_query\s*\(\s*[^,]+,\s*[\'"][^\'",]*\'\s*\.\s*', 
-             "Potential SQL Injection",
-             "String concatenation used with SQL queries is vulnerable to SQL injection attacks.",
-             "Use prepared statements with mysqli_prepare() instead of string concatenation."),
-             
-            (r'mysql_query\s*\(\s*[\'"][^\'",]*\'\s*\.\s*', 
-             "Potential SQL Injection",
-             "String concatenation used with mysql_query() is vulnerable to SQL injection attacks.",
-             "Use prepared statements with mysqli_prepare() instead of deprecated mysql_query().")
-        ]
-        
-        for pattern, vuln_type, description, recommendation in sql_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': recommendation
-                })
-        
-        # Check for command injection vulnerabilities
-        cmd_patterns = [
-            (r'(?:system|exec|shell_exec|passthru|proc_open)\s*\(\s*[^)]*\.\s*', 
-             "Potential Command Injection",
-             "String concatenation used with command execution functions is vulnerable to command injection attacks.",
-             "Avoid using command execution functions with user input, or properly validate and escape inputs.")
-        ]
-        
-        for pattern, vuln_type, description, recommendation in cmd_patterns:
-            matches = re.finditer(pattern, code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': vuln_type,
-                    'description': description,
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': recommendation
-                })
-        
-        # Check for XSS vulnerabilities
-        if 'echo' in code and not ('htmlspecialchars' in code or 'htmlentities' in code):
-            matches = re.finditer(r'echo\s+\$_(?:GET|POST|REQUEST|COOKIE)', code)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                line = code.splitlines()[line_num - 1].strip()
-                vulnerabilities.append({
-                    'type': "Potential Cross-Site Scripting (XSS)",
-                    'description': "Outputting user input without proper escaping can lead to XSS vulnerabilities.",
-                    'line': line_num,
-                    'code': line,
-                    'recommendation': "Use htmlspecialchars() or htmlentities() to escape user input before outputting it."
-                })
-        
-        return vulnerabilities
+        return _find_vulnerabilities("php", code)
     
     def _detect_project_type(self, project_path):
         """Detect the type of project based on dependency files."""
-        if os.path.isfile(project_path):
-            if project_path.endswith("package.json"):
-                return "nodejs"
-            elif project_path.endswith("requirements.txt"):
-                return "python"
-            elif project_path.endswith("pyproject.toml"):
-                return "python"
+        try:
+            mtime_ns = os.stat(project_path).st_mtime_ns
+        except OSError:
             return None
-        
-        # Check for dependency files in directory
-        if os.path.isdir(project_path):
-            if os.path.exists(os.path.join(project_path, "package.json")):
-                return "nodejs"
-            elif os.path.exists(os.path.join(project_path, "requirements.txt")):
-                return "python"
-            elif os.path.exists(os.path.join(project_path, "pyproject.toml")):
-                return "python"
-        
-        return None
+        return _project_type(os.path.abspath(project_path), mtime_ns)
     
     def _extract_dependencies(self, project_path, project_type):
         """Extract dependencies from project files."""
@@ -963,46 +1590,36 @@ class SecurityAgent(BaseAgent):
                 try:
                     with open(requirements_path, 'r') as f:
                         for line in f:
-                            line = line.strip()
+                            # Drop comments; option lines such as -r or -e do not parse
+                            line = _REQUIREMENT_COMMENT_RE.split(line, 1)[0].strip()
                             if line and not line.startswith('#'):
                                 # Parse requirement line (e.g., "flask==2.0.1")
-                                parts = line.split('==')
-                                if len(parts) == 2:
-                                    dependencies[parts[0]] = parts[1]
-                                else:
-                                    # Handle other formats like >=, ~=, etc.
-                                    name = line.split('>=')[0].split('<=')[0].split('~=')[0].split('>')[0].split('<')[0].strip()
-                                    version = line.replace(name, '').strip()
-                                    if name:
-                                        dependencies[name] = version if version else "latest"
+                                parsed = _parse_requirement(line)
+                                if parsed:
+                                    dependencies[parsed[0]] = parsed[1]
                 except Exception as e:
                     logger.warning(f"Error parsing requirements.txt: {str(e)}")
             
             # Then try pyproject.toml
             elif pyproject_path and os.path.exists(pyproject_path):
                 try:
-                    with open(pyproject_path, 'r') as f:
-                        content = f.read()
+                    with open(pyproject_path, 'rb') as f:
+                        pyproject = tomllib.load(f)
                     
-                    # Very basic TOML parsing for dependencies
-                    # This is not a full TOML parser
-                    in_dependencies = False
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if "[tool.poetry.dependencies]" in line or "[project.dependencies]" in line:
-                            in_dependencies = True
-                            continue
-                        elif in_dependencies and line.startswith('['):
-                            in_dependencies = False
+                    # PEP 621: a list of requirement strings
+                    for requirement in pyproject.get("project", {}).get("dependencies", []):
+                        parsed = _parse_requirement(requirement)
+                        if parsed:
+                            dependencies[parsed[0]] = parsed[1]
+                    
+                    # Poetry: a table of name = "version" or name = {version = "...", ...}
+                    poetry = pyproject.get("tool", {}).get("poetry", {})
+                    for name, spec in poetry.get("dependencies", {}).items():
+                        if name == "python":  # Skip python version constraint
                             continue
-                        
-                        if in_dependencies and '=' in line:
-                            parts = line.split('=')
-                            if len(parts) >= 2:
-                                name = parts[0].strip().strip('"').strip("'")
-                                version = parts[1].strip().strip('"').strip("'")
-                                if name != "python" and name:  # Skip python version constraint
-                                    dependencies[name] = version
+                        if isinstance(spec, dict):
+                            spec = spec.get("version", "latest")
+                        dependencies[name] = spec if isinstance(spec, str) else "latest"
                 except Exception as e:
                     logger.warning(f"Error parsing pyproject.toml: {str(e)}")
         
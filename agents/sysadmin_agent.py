@@ -1,15 +1,67 @@
 import os
+import time
+import heapq
+import shlex
+import selectors
 import subprocess
 import platform
 import logging
-import shutil
+import fnmatch
 import psutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from agents.base_agent import BaseAgent
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# A CPU usage sample is reused for this many seconds
+_CPU_SAMPLE_TTL = 2.0
+# Shortest span a CPU usage sample is measured over
+_CPU_MIN_INTERVAL = 0.1
+
+# Limits for commands run with exec
+_SHELL_TIMEOUT = 15
+_SHELL_OUTPUT_LIMIT = 1024 * 1024
+_SHELL_READ_SIZE = 65536
+# Characters only /bin/sh can interpret; commands without them are run
+# directly, split into arguments as the shell would split them
+_SHELL_METACHARS = frozenset("|&;<>()$`\\*?[]{}~#=!\n")
+
+# How long meminfo reuses its top-processes table: from the minimum, the
+# wait grows by the backoff factor each time the top processes are
+# unchanged, up to the maximum
+_TOP_MEMORY_MIN_TTL = 2.5
+_TOP_MEMORY_MAX_TTL = 15.0
+_TOP_MEMORY_BACKOFF = 1.5
+
+# Most subdirectories sized at once by diskspace
+_DIR_SIZE_WORKERS = 16
+
+# Most directories, and most files, listed by find
+_FIND_MAX_RESULTS = 100
+
+
+@lru_cache(maxsize=None)
+def _static_system_info():
+    """
+    Describe the parts of the system that cannot change while running.
+    
+    Built on first use rather than at import, since reading the platform
+    and core counts touches several files.
+    
+    Returns:
+        The OS, platform, Python version and CPU core lines of sysinfo
+    """
+    return (
+        f"OS: {platform.system()} {platform.release()}\n"
+        f"Platform: {platform.platform()}\n"
+        f"Python Version: {platform.python_version()}\n"
+        f"CPU Cores: {psutil.cpu_count(logical=False)} physical, {psutil.cpu_count(logical=True)} logical\n"
+    )
+
+
 class SysAdminAgent(BaseAgent):
     """
     The SysAdmin Agent - specialized in system administration tasks.
@@ -32,6 +84,12 @@ class SysAdminAgent(BaseAgent):
             "rm -rf", "sudo", "chmod", "chown", "> /dev/", "format", "mkfs", "dd",
             "> /proc", "mv /*", "echo > /dev/", ":(){ :|:& };:", "> /etc/passwd"
         ]
+        # CPU usage is measured since the previous sample rather than by
+        # blocking; this call starts the first measurement span
+        psutil.cpu_percent(interval=None)
+        self._last_cpu = (time.monotonic(), None)
+        # (built at, rows, reuse time, PIDs of the top 5) of meminfo's table
+        self._top_memory = (0.0, None, _TOP_MEMORY_MIN_TTL, ())
     
     def get_commands(self):
         """Return the commands this agent can handle."""
@@ -141,20 +199,19 @@ class SysAdminAgent(BaseAgent):
             if not self._is_safe_command(command):
                 return f"Error: The command '{command}' contains potentially harmful operations and is not allowed."
             
-            # Execute with timeout for safety
-            result = subprocess.run(
-                command, 
-                shell=True, 
-                capture_output=True, 
-                text=True,
-                timeout=15
-            )
+            # Execute with timeout and output limit for safety
+            returncode, output, error, truncated = self._run_shell(command)
             
-            output = result.stdout
-            error = result.stderr
+            if truncated:
+                # Both streams, since either may hold what ran before the cut
+                combined = "\n".join(part for part in (output, error) if part)
+                return (
+                    f"{combined}\n"
+                    f"[Output truncated at {self._format_bytes(_SHELL_OUTPUT_LIMIT)}; the command was stopped]"
+                )
             
-            if result.returncode != 0:
-                return f"Command executed with errors (return code {result.returncode}):\n{error}"
+            if returncode != 0:
+                return f"Command executed with errors (return code {returncode}):\n{error}"
             
             if not output and not error:
                 return "Command executed successfully (no output)."
@@ -162,36 +219,109 @@ class SysAdminAgent(BaseAgent):
             return output if output else error
         
         except subprocess.TimeoutExpired:
-            return "Error: Command execution timed out (15 seconds limit)."
+            return f"Error: Command execution timed out ({_SHELL_TIMEOUT} seconds limit)."
         except Exception as e:
             logger.error(f"Error executing shell command: {str(e)}")
             return f"Error executing command: {str(e)}"
     
+    def _spawn_shell(self, command):
+        """
+        Start a shell command with its output piped back.
+        
+        A command without shell syntax is started directly, saving the
+        /bin/sh process. Everything else, and any command that is not an
+        executable (such as a shell builtin), is left to the shell.
+        
+        Args:
+            command: The shell command to start
+            
+        Returns:
+            The started subprocess.Popen
+        """
+        options = dict(stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=_SHELL_READ_SIZE)
+        if not _SHELL_METACHARS.intersection(command):
+            try:
+                argv = shlex.split(command)
+                if argv:
+                    return subprocess.Popen(argv, **options)
+            except (ValueError, OSError):
+                pass
+        return subprocess.Popen(command, shell=True, **options)
+    
+    def _run_shell(self, command):
+        """
+        Run a shell command, reading its output as it is produced.
+        
+        The command is killed once its combined output passes
+        _SHELL_OUTPUT_LIMIT bytes, instead of buffering all of it, and only
+        the first _SHELL_OUTPUT_LIMIT bytes are returned.
+        
+        Args:
+            command: The shell command to run
+            
+        Returns:
+            Tuple of (return code, stdout, stderr, truncated)
+            
+        Raises:
+            subprocess.TimeoutExpired: If the command runs past _SHELL_TIMEOUT
+        """
+        deadline = time.monotonic() + _SHELL_TIMEOUT
+        with self._spawn_shell(command) as proc:
+            buffers = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+            size = 0
+            truncated = False
+            
+            try:
+                with selectors.DefaultSelector() as selector:
+                    for pipe in buffers:
+                        selector.register(pipe, selectors.EVENT_READ)
+                    
+                    while selector.get_map() and not truncated:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise subprocess.TimeoutExpired(command, _SHELL_TIMEOUT)
+                        for key, _ in selector.select(remaining):
+                            chunk = os.read(key.fd, _SHELL_READ_SIZE)
+                            if not chunk:
+                                selector.unregister(key.fileobj)
+                                continue
+                            buffers[key.fileobj] += chunk
+                            size += len(chunk)
+                            if size > _SHELL_OUTPUT_LIMIT:
+                                # Keep the output within the limit, not the limit plus a read
+                                del buffers[key.fileobj][_SHELL_OUTPUT_LIMIT - size:]
+                                truncated = True
+                                break
+                
+                if truncated:
+                    proc.kill()
+                returncode = proc.wait(timeout=max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                raise
+        
+        stdout = buffers[proc.stdout].decode(errors="replace")
+        stderr = buffers[proc.stderr].decode(errors="replace")
+        return returncode, stdout, stderr, truncated
+    
     def _get_system_info(self):
         """Get information about the system."""
         try:
-            result = "System Information:\n\n"
+            parts = ["System Information:\n\n"]
             
-            # OS information
-            result += f"OS: {platform.system()} {platform.release()}\n"
-            result += f"Platform: {platform.platform()}\n"
-            result += f"Python Version: {platform.python_version()}\n"
-            
-            # CPU information
-            cpu_count = psutil.cpu_count(logical=False)
-            cpu_count_logical = psutil.cpu_count(logical=True)
-            result += f"CPU Cores: {cpu_count} physical, {cpu_count_logical} logical\n"
-            result += f"CPU Usage: {psutil.cpu_percent(interval=1)}%\n"
+            # OS and CPU information
+            parts.append(_static_system_info())
+            parts.append(f"CPU Usage: {self._cpu_percent()}%\n")
             
             # Memory information
             mem = psutil.virtual_memory()
-            result += f"Memory: {self._format_bytes(mem.total)} total, {self._format_bytes(mem.available)} available\n"
-            result += f"Memory Usage: {mem.percent}%\n"
+            parts.append(f"Memory: {self._format_bytes(mem.total)} total, {self._format_bytes(mem.available)} available\n")
+            parts.append(f"Memory Usage: {mem.percent}%\n")
             
             # Disk information
             disk = psutil.disk_usage('/')
-            result += f"Disk: {self._format_bytes(disk.total)} total, {self._format_bytes(disk.free)} free\n"
-            result += f"Disk Usage: {disk.percent}%\n"
+            parts.append(f"Disk: {self._format_bytes(disk.total)} total, {self._format_bytes(disk.free)} free\n")
+            parts.append(f"Disk Usage: {disk.percent}%\n")
             
             # Network information
             addresses = []
@@ -201,24 +331,44 @@ class SysAdminAgent(BaseAgent):
                         addresses.append(f"{interface}: {addr.address}")
             
             if addresses:
-                result += "\nNetwork Interfaces:\n"
+                parts.append("\nNetwork Interfaces:\n")
                 for addr in addresses:
-                    result += f"- {addr}\n"
+                    parts.append(f"- {addr}\n")
             
             # Environment
-            result += "\nEnvironment Variables:\n"
+            parts.append("\nEnvironment Variables:\n")
             # Only show safe environment variables
             safe_vars = ["PATH", "PYTHONPATH", "HOME", "USER", "SHELL", "LANG", "PWD"]
             for var in safe_vars:
                 if var in os.environ:
-                    result += f"- {var}: {os.environ.get(var)}\n"
+                    parts.append(f"- {var}: {os.environ.get(var)}\n")
             
-            return result
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error getting system info: {str(e)}")
             return f"Error getting system info: {str(e)}"
     
+    def _cpu_percent(self):
+        """
+        Get system-wide CPU usage without blocking for a full interval.
+        
+        Returns:
+            CPU usage percentage since the previous sample, reused for
+            _CPU_SAMPLE_TTL seconds
+        """
+        sampled_at, value = self._last_cpu
+        elapsed = time.monotonic() - sampled_at
+        if value is not None and elapsed < _CPU_SAMPLE_TTL:
+            return value
+        
+        # Too short a span since the last sample gives a meaningless reading
+        if elapsed < _CPU_MIN_INTERVAL:
+            time.sleep(_CPU_MIN_INTERVAL - elapsed)
+        value = psutil.cpu_percent(interval=None)
+        self._last_cpu = (time.monotonic(), value)
+        return value
+    
     def _format_bytes(self, bytes):
         """Format bytes to human-readable format."""
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -240,58 +390,93 @@ class SysAdminAgent(BaseAgent):
         try:
             logger.debug(f"Getting disk space for path: {path}")
             
-            if not os.path.exists(path):
+            # Get disk usage for the path, computed as shutil.disk_usage
+            # does; statvfs also reports a missing path
+            try:
+                stats = os.statvfs(path)
+            except FileNotFoundError:
                 return f"Error: Path '{path}' does not exist."
+            total = stats.f_blocks * stats.f_frsize
+            used = (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+            free = stats.f_bavail * stats.f_frsize
             
-            # Get disk usage for the path
-            disk_usage = shutil.disk_usage(path)
-            
-            result = f"Disk Usage for {path}:\n\n"
-            result += f"Total Space: {self._format_bytes(disk_usage.total)}\n"
-            result += f"Used Space: {self._format_bytes(disk_usage.used)} ({disk_usage.used / disk_usage.total:.1%})\n"
-            result += f"Free Space: {self._format_bytes(disk_usage.free)} ({disk_usage.free / disk_usage.total:.1%})\n"
+            parts = [f"Disk Usage for {path}:\n\n"]
+            parts.append(f"Total Space: {self._format_bytes(total)}\n")
+            parts.append(f"Used Space: {self._format_bytes(used)} ({used / total:.1%})\n")
+            parts.append(f"Free Space: {self._format_bytes(free)} ({free / total:.1%})\n")
             
             # Get directory size if it's a directory
             if os.path.isdir(path):
                 try:
-                    dir_size = self._get_dir_size(path)
-                    result += f"\nDirectory Size: {self._format_bytes(dir_size)}\n"
+                    # The directory size is the size of its top-level files
+                    # plus that of each subdirectory it does not reach
+                    # through a symlink, so the tree is walked only once
+                    dir_size = 0
+                    entries = []
+                    with os.scandir(path) as it:
+                        for entry in it:
+                            try:
+                                if entry.is_dir():
+                                    entries.append(entry)
+                                elif not entry.is_symlink():
+                                    dir_size += entry.stat(follow_symlinks=False).st_size
+                            except OSError:
+                                continue
+                    
+                    # Subdirectory walks spend their time in stat calls,
+                    # which release the GIL, so they run side by side
+                    sizes = []
+                    if entries:
+                        with ThreadPoolExecutor(max_workers=min(_DIR_SIZE_WORKERS, len(entries))) as executor:
+                            sizes = list(executor.map(self._get_dir_size, [entry.path for entry in entries]))
                     
-                    # List largest subdirectories
-                    result += "\nLargest Subdirectories:\n"
                     subdirs = []
+                    for entry, size in zip(entries, sizes):
+                        subdirs.append((entry.name, size))
+                        if not entry.is_symlink():
+                            dir_size += size
                     
-                    for item in os.listdir(path):
-                        item_path = os.path.join(path, item)
-                        if os.path.isdir(item_path):
-                            try:
-                                size = self._get_dir_size(item_path)
-                                subdirs.append((item, size))
-                            except:
-                                continue
+                    parts.append(f"\nDirectory Size: {self._format_bytes(dir_size)}\n")
+                    
+                    # List largest subdirectories
+                    parts.append("\nLargest Subdirectories:\n")
                     
                     # Sort by size (largest first) and show top 5
                     subdirs.sort(key=lambda x: x[1], reverse=True)
                     for i, (subdir, size) in enumerate(subdirs[:5], 1):
-                        result += f"{i}. {subdir}: {self._format_bytes(size)}\n"
+                        parts.append(f"{i}. {subdir}: {self._format_bytes(size)}\n")
                     
                 except Exception as dir_e:
-                    result += f"\nCould not calculate directory size: {str(dir_e)}\n"
+                    parts.append(f"\nCould not calculate directory size: {str(dir_e)}\n")
             
-            return result
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error getting disk space: {str(e)}")
             return f"Error getting disk space: {str(e)}"
     
     def _get_dir_size(self, path):
-        """Calculate the total size of a directory."""
+        """Calculate the total size of a directory, not following symlinks."""
         total_size = 0
-        for dirpath, _, filenames in os.walk(path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                if os.path.exists(file_path) and not os.path.islink(file_path):
-                    total_size += os.path.getsize(file_path)
+        # Directory entries carry their type, so each file costs one stat
+        stack = [path]
+        while stack:
+            # Like os.walk, stop at a directory that cannot be listed
+            # (opening it or partway through) and skip files that vanish
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_symlink():
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        try:
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            continue
+            except OSError:
+                continue
         return total_size
     
     def _list_processes(self, filter_term=None):
@@ -307,13 +492,18 @@ class SysAdminAgent(BaseAgent):
         try:
             logger.debug(f"Listing processes with filter: {filter_term}")
             
-            result = "Running Processes:\n\n"
-            result += f"{'PID':<7} {'CPU%':<6} {'Memory%':<8} {'Name':<30} Command\n"
-            result += "-" * 80 + "\n"
+            parts = ["Running Processes:\n\n"]
+            parts.append(f"{'PID':<7} {'CPU%':<6} {'Memory%':<8} {'Name':<30} Command\n")
+            parts.append("-" * 80 + "\n")
             
             # Get list of processes
             processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cpu_percent', 'memory_percent']):
+            # With a filter, usage is only read for the processes it keeps;
+            # without one, every process is listed and it is read up front
+            attrs = ['pid', 'name', 'cmdline']
+            if not filter_term:
+                attrs += ['cpu_percent', 'memory_percent']
+            for proc in psutil.process_iter(attrs):
                 try:
                     # Filter processes if a filter term is provided
                     if filter_term:
@@ -321,29 +511,31 @@ class SysAdminAgent(BaseAgent):
                             filter_term.lower() in cmd.lower() for cmd in proc.info['cmdline'] if cmd
                         ):
                             continue
+                        
+                        with proc.oneshot():
+                            proc.info['cpu_percent'] = proc.cpu_percent()
+                            proc.info['memory_percent'] = proc.memory_percent()
                     
-                    cmd = " ".join(proc.info['cmdline']) if proc.info['cmdline'] else "[No command]"
                     processes.append({
                         'pid': proc.info['pid'],
                         'name': proc.info['name'],
-                        'cmd': cmd,
+                        'cmdline': proc.info['cmdline'],
                         'cpu': proc.info['cpu_percent'],
                         'memory': proc.info['memory_percent']
                     })
                 except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                     pass
             
-            # Sort by memory usage (highest first)
-            processes.sort(key=lambda x: x['memory'], reverse=True)
-            
-            # Display top 20 processes
-            for proc in processes[:20]:
-                result += f"{proc['pid']:<7} {proc['cpu']:<6.1f} {proc['memory']:<8.1f} {proc['name'][:30]:<30} {proc['cmd'][:50]}\n"
+            # Display the top 20 processes by memory usage (highest first);
+            # only their command lines are joined
+            for proc in heapq.nlargest(20, processes, key=lambda x: x['memory']):
+                cmd = " ".join(proc['cmdline']) if proc['cmdline'] else "[No command]"
+                parts.append(f"{proc['pid']:<7} {proc['cpu']:<6.1f} {proc['memory']:<8.1f} {proc['name'][:30]:<30} {cmd[:50]}\n")
             
             if len(processes) > 20:
-                result += f"\n... and {len(processes) - 20} more processes."
+                parts.append(f"\n... and {len(processes) - 20} more processes.")
             
-            return result
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error listing processes: {str(e)}")
@@ -358,48 +550,75 @@ class SysAdminAgent(BaseAgent):
             vm = psutil.virtual_memory()
             swap = psutil.swap_memory()
             
-            result = "Memory Information:\n\n"
-            result += "Virtual Memory:\n"
-            result += f"Total: {self._format_bytes(vm.total)}\n"
-            result += f"Available: {self._format_bytes(vm.available)} ({vm.available / vm.total:.1%})\n"
-            result += f"Used: {self._format_bytes(vm.used)} ({vm.percent}%)\n"
-            result += f"Free: {self._format_bytes(vm.free)}\n"
+            parts = ["Memory Information:\n\n"]
+            parts.append("Virtual Memory:\n")
+            parts.append(f"Total: {self._format_bytes(vm.total)}\n")
+            parts.append(f"Available: {self._format_bytes(vm.available)} ({vm.available / vm.total:.1%})\n")
+            parts.append(f"Used: {self._format_bytes(vm.used)} ({vm.percent}%)\n")
+            parts.append(f"Free: {self._format_bytes(vm.free)}\n")
             
-            result += "\nSwap Memory:\n"
-            result += f"Total: {self._format_bytes(swap.total)}\n"
-            result += f"Used: {self._format_bytes(swap.used)} ({swap.percent}%)\n"
-            result += f"Free: {self._format_bytes(swap.free)}\n"
+            parts.append("\nSwap Memory:\n")
+            parts.append(f"Total: {self._format_bytes(swap.total)}\n")
+            parts.append(f"Used: {self._format_bytes(swap.used)} ({swap.percent}%)\n")
+            parts.append(f"Free: {self._format_bytes(swap.free)}\n")
             
             # Get top memory-consuming processes
-            result += "\nTop Memory-Consuming Processes:\n"
-            result += f"{'PID':<7} {'Memory%':<8} {'Name':<30} Command\n"
-            result += "-" * 80 + "\n"
-            
-            # Get list of processes sorted by memory usage
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'memory_percent']):
-                try:
-                    cmd = " ".join(proc.info['cmdline']) if proc.info['cmdline'] else "[No command]"
-                    processes.append({
-                        'pid': proc.info['pid'],
-                        'name': proc.info['name'],
-                        'cmd': cmd,
-                        'memory': proc.info['memory_percent']
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
+            parts.append("\nTop Memory-Consuming Processes:\n")
+            parts.append(f"{'PID':<7} {'Memory%':<8} {'Name':<30} Command\n")
+            parts.append("-" * 80 + "\n")
+            parts.append(self._top_memory_processes())
             
-            # Sort by memory usage and show top 10
-            processes.sort(key=lambda x: x['memory'], reverse=True)
-            for proc in processes[:10]:
-                result += f"{proc['pid']:<7} {proc['memory']:<8.1f} {proc['name'][:30]:<30} {proc['cmd'][:50]}\n"
-            
-            return result
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error getting memory info: {str(e)}")
             return f"Error getting memory info: {str(e)}"
     
+    def _top_memory_processes(self):
+        """
+        Format the rows of meminfo's top memory-consuming processes table.
+        
+        Walking every process is the slow part of meminfo, so the rows are
+        reused for a while. The reuse time grows while the top processes
+        stay the same and drops back once they change.
+        
+        Returns:
+            The table rows
+        """
+        built_at, rows, ttl, top_pids = self._top_memory
+        now = time.monotonic()
+        if rows is not None and now - built_at < ttl:
+            return rows
+        
+        # Get list of processes sorted by memory usage
+        processes = []
+        for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'memory_percent']):
+            try:
+                processes.append({
+                    'pid': proc.info['pid'],
+                    'name': proc.info['name'],
+                    'cmdline': proc.info['cmdline'],
+                    'memory': proc.info['memory_percent']
+                })
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+        
+        # Show the top 10 by memory usage, joining only their command lines
+        top = heapq.nlargest(10, processes, key=lambda x: x['memory'])
+        parts = []
+        for proc in top:
+            cmd = " ".join(proc['cmdline']) if proc['cmdline'] else "[No command]"
+            parts.append(f"{proc['pid']:<7} {proc['memory']:<8.1f} {proc['name'][:30]:<30} {cmd[:50]}\n")
+        rows = "".join(parts)
+        
+        pids = tuple(proc['pid'] for proc in top[:5])
+        if pids == top_pids:
+            ttl = min(ttl * _TOP_MEMORY_BACKOFF, _TOP_MEMORY_MAX_TTL)
+        else:
+            ttl = _TOP_MEMORY_MIN_TTL
+        self._top_memory = (now, rows, ttl, pids)
+        return rows
+    
     def _find_files(self, path, pattern):
         """
         Find files in a directory that match a pattern.
@@ -420,45 +639,63 @@ class SysAdminAgent(BaseAgent):
             if not os.path.isdir(path):
                 return f"Error: '{path}' is not a directory."
             
-            # Use Path.glob to find matching files
-            p = Path(path)
-            matches = list(p.glob(pattern))
-            
-            if not matches:
-                return f"No files found in '{path}' matching pattern '{pattern}'."
-            
-            result = f"Files matching '{pattern}' in '{path}':\n\n"
-            
             # Group by file type
             files = []
             dirs = []
             
-            for match in matches:
-                if match.is_dir():
-                    dirs.append(match)
-                else:
-                    # For files, include size information
-                    try:
-                        size = os.path.getsize(match)
-                        files.append((match, size))
-                    except:
-                        files.append((match, 0))
+            if "/" in pattern or "**" in pattern:
+                # Use Path.glob for patterns that reach into subdirectories
+                for match in Path(path).glob(pattern):
+                    if match.is_dir():
+                        dirs.append(match)
+                    else:
+                        # For files, include size information
+                        try:
+                            size = os.path.getsize(match)
+                            files.append((match.name, size))
+                        except:
+                            files.append((match.name, 0))
+                dirs = [dir_path.name for dir_path in sorted(dirs)]
+            else:
+                # A pattern within the directory only needs its listing,
+                # whose entries are typed and stat'ed once each
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if not fnmatch.fnmatchcase(entry.name, pattern):
+                            continue
+                        if entry.is_dir():
+                            dirs.append(entry.name)
+                        else:
+                            try:
+                                files.append((entry.name, entry.stat().st_size))
+                            except OSError:
+                                files.append((entry.name, 0))
+                dirs.sort()
+            
+            if not dirs and not files:
+                return f"No files found in '{path}' matching pattern '{pattern}'."
+            
+            parts = [f"Files matching '{pattern}' in '{path}':\n\n"]
             
             # Display directories
             if dirs:
-                result += "Directories:\n"
-                for i, dir_path in enumerate(sorted(dirs), 1):
-                    result += f"{i}. {dir_path.name}/\n"
-                result += "\n"
+                parts.append("Directories:\n")
+                for i, dir_name in enumerate(dirs[:_FIND_MAX_RESULTS], 1):
+                    parts.append(f"{i}. {dir_name}/\n")
+                if len(dirs) > _FIND_MAX_RESULTS:
+                    parts.append(f"... and {len(dirs) - _FIND_MAX_RESULTS} more directories.\n")
+                parts.append("\n")
             
             # Display files with size information
             if files:
-                files.sort(key=lambda x: x[0].name)  # Sort by name
-                result += "Files:\n"
-                for i, (file_path, size) in enumerate(files, 1):
-                    result += f"{i}. {file_path.name} ({self._format_bytes(size)})\n"
-            
-            return result
+                files.sort(key=lambda x: x[0])  # Sort by name
+                parts.append("Files:\n")
+                for i, (file_name, size) in enumerate(files[:_FIND_MAX_RESULTS], 1):
+                    parts.append(f"{i}. {file_name} ({self._format_bytes(size)})\n")
+                if len(files) > _FIND_MAX_RESULTS:
+                    parts.append(f"... and {len(files) - _FIND_MAX_RESULTS} more files.\n")
+            
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error finding files: {str(e)}")
@@ -9,6 +9,75 @@ from agents.base_agent import BaseAgent
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Workspace setting values stored as floats
+_FLOAT_RE = re.compile(r'^-?\d+\.\d+$')
+
+# Commands this agent can handle, built once; callers only read it
+_COMMANDS = {
+    "install-extension": {
+        "description": "Install a VS Code extension",
+        "usage": "install-extension <extension_id>",
+        "examples": [
+            "install-extension ms-python.python",
+            "install-extension dbaeumer.vscode-eslint"
+        ]
+    },
+    "create-task": {
+        "description": "Create a VS Code task configuration",
+        "usage": "create-task <task_name> <command> [args]",
+        "examples": [
+            "create-task build 'npm run build'",
+            "create-task test 'python -m unittest discover'"
+        ]
+    },
+    "create-launch": {
+        "description": "Create a VS Code launch/debug configuration",
+        "usage": "create-launch <name> <type> [program]",
+        "examples": [
+            "create-launch 'Python Debug' python app.py",
+            "create-launch 'Node Server' node server.js"
+        ]
+    },
+    "workspace-setting": {
+        "description": "Create or update a workspace setting",
+        "usage": "workspace-setting <setting_name> <value>",
+        "examples": [
+            "workspace-setting editor.tabSize 2",
+            "workspace-setting python.linting.enabled true"
+        ]
+    },
+    "create-keybinding": {
+        "description": "Create a custom keybinding for VS Code",
+        "usage": "create-keybinding <key> <command>",
+        "examples": [
+            "create-keybinding 'ctrl+alt+t' 'workbench.action.terminal.new'",
+            "create-keybinding 'ctrl+shift+r' 'editor.action.startFindReplaceAction'"
+        ]
+    },
+    "linux-terminal": {
+        "description": "Create a VS Code terminal profile for Linux",
+        "usage": "linux-terminal <name> <shell_path>",
+        "examples": [
+            "linux-terminal bash /bin/bash",
+            "linux-terminal zsh /usr/bin/zsh"
+        ]
+    },
+    "recommend-extensions": {
+        "description": "Get recommended VS Code extensions based on project type",
+        "usage": "recommend-extensions <project_type>",
+        "examples": [
+            "recommend-extensions python",
+            "recommend-extensions javascript",
+            "recommend-extensions web"
+        ]
+    },
+    "list-extensions": {
+        "description": "List installed VS Code extensions",
+        "usage": "list-extensions",
+        "examples": ["list-extensions"]
+    }
+}
+
 class VSCodeAgent(BaseAgent):
     """
     The VSCode Agent - specialized in VS Code and Linux integration.
@@ -30,70 +99,7 @@ class VSCodeAgent(BaseAgent):
     
     def get_commands(self):
         """Return the commands this agent can handle."""
-        return {
-            "install-extension": {
-                "description": "Install a VS Code extension",
-                "usage": "install-extension <extension_id>",
-                "examples": [
-                    "install-extension ms-python.python",
-                    "install-extension dbaeumer.vscode-eslint"
-                ]
-            },
-            "create-task": {
-                "description": "Create a VS Code task configuration",
-                "usage": "create-task <task_name> <command> [args]",
-                "examples": [
-                    "create-task build 'npm run build'",
-                    "create-task test 'python -m unittest discover'"
-                ]
-            },
-            "create-launch": {
-                "description": "Create a VS Code launch/debug configuration",
-                "usage": "create-launch <name> <type> [program]",
-                "examples": [
-                    "create-launch 'Python Debug' python app.py",
-                    "create-launch 'Node Server' node server.js"
-                ]
-            },
-            "workspace-setting": {
-                "description": "Create or update a workspace setting",
-                "usage": "workspace-setting <setting_name> <value>",
-                "examples": [
-                    "workspace-setting editor.tabSize 2",
-                    "workspace-setting python.linting.enabled true"
-                ]
-            },
-            "create-keybinding": {
-                "description": "Create a custom keybinding for VS Code",
-                "usage": "create-keybinding <key> <command>",
-                "examples": [
-                    "create-keybinding 'ctrl+alt+t' 'workbench.action.terminal.new'",
-                    "create-keybinding 'ctrl+shift+r' 'editor.action.startFindReplaceAction'"
-                ]
-            },
-            "linux-terminal": {
-                "description": "Create a VS Code terminal profile for Linux",
-                "usage": "linux-terminal <name> <shell_path>",
-                "examples": [
-                    "linux-terminal bash /bin/bash",
-                    "linux-terminal zsh /usr/bin/zsh"
-                ]
-            },
-            "recommend-extensions": {
-                "description": "Get recommended VS Code extensions based on project type",
-                "usage": "recommend-extensions <project_type>",
-                "examples": [
-                    "recommend-extensions python",
-                    "recommend-extensions javascript",
-                    "recommend-extensions web"
-                ]
-            },
-            "list-extensions": {
-                "description": "List installed VS Code extensions",
-                "usage": "list-extensions",
-                "examples": ["list-extensions"]
-            }
-        }
+        return _COMMANDS
     
     def execute(self, command, args):
         """Execute a VSCodeAgent command."""
@@ -383,7 +389,7 @@ VS Code extensions on your local machine.
                     parsed_value = False
                 elif setting_value.isdigit():
                     parsed_value = int(setting_value)
-                elif re.match(r'^-?\d+\.\d+$', setting_value):
+                elif _FLOAT_RE.match(setting_value):
                     parsed_value = float(setting_value)
                 elif setting_value.startswith('[') and setting_value.endswith(']'):
                     parsed_value = json.loads(setting_value)